@@ -1,4 +1,5 @@
 from typing import List, Optional
+from bson import ObjectId
 from models.models import User, Habit
 
 
@@ -7,7 +8,7 @@ class AdminDBRepository:
         return await User.get(user_id)
 
     async def list_habits_for_user(self, user_id: str) -> List[Habit]:
-        return await Habit.find(Habit.owner_id == user_id).to_list()
+        return await Habit.find(Habit.owner_id == ObjectId(user_id)).to_list()
 
     async def delete_habit(self, habit: Habit) -> None:
         await habit.delete()
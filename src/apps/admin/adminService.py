@@ -1,16 +1,37 @@
-from typing import List
+from datetime import date, timedelta
+from typing import List, Optional
 from fastapi import HTTPException, status
 from schemas.habits import HabitProgress
 from schemas.roles import TokenData
 from apps.admin.adminDBRepository import AdminDBRepository
+from apps.auth.tokenRevocation import revocation_list
+from apps.daily_completions.calendarStatsCache import calendar_stats_cache
+from apps.daily_completions.dailyCompletionsDBRepository import (
+    DailyCompletionsDBRepository,
+)
+from apps.habits.habitRollupDBRepository import HabitRollupDBRepository
+from apps.habits.habitsCategoryCache import category_cache
+from apps.habits.habitsClassifier import classifier
+from apps.habits.templateCatalogCache import template_catalog_cache
+from apps.journal.journalScheduler import question_scheduler
+from apps.user.userCache import user_cache
+from utils import revisions
+from utils.password_pool import password_hasher
+from utils.token_cache import token_cache
 
 
 class AdminService:
     def __init__(self):
         self.repo = AdminDBRepository()
+        self.completions_repo = DailyCompletionsDBRepository()
+        self.rollup_repo = HabitRollupDBRepository()
 
     async def get_user_progress(
-        self, user_id: str, admin: TokenData
+        self,
+        user_id: str,
+        admin: TokenData,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
     ) -> List[HabitProgress]:
         user = await self.repo.get_user(user_id)
         if not user:
@@ -18,11 +39,17 @@ class AdminService:
                 status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
             )
         habits = await self.repo.list_habits_for_user(user_id)
+        totals = {
+            row["_id"]: row
+            for row in await self.completions_repo.habit_totals(
+                user_id, start, end + timedelta(days=1) if end else None
+            )
+        }
         result: List[HabitProgress] = []
         for habit in habits:
-            logs = await self.repo.list_logs_for_habit(user_id, str(habit.id))
-            total = len(logs)
-            done = sum(1 for log in logs if log.completed)
+            row = totals.get(habit.id, {})
+            total = row.get("total_days", 0)
+            done = row.get("completed_days", 0)
             rate = (done / total * 100) if total else 0.0
             result.append(
                 HabitProgress(
@@ -43,3 +70,32 @@ class AdminService:
                 status_code=status.HTTP_404_NOT_FOUND, detail="Hábito no encontrado"
             )
         await self.repo.delete_habit(habit)
+        await self.completions_repo.remove_habit(str(habit.owner_id), habit_id)
+        await self.rollup_repo.remove(habit_id)
+        await revisions.bump(
+            habit.owner_id, revisions.HABITS, revisions.DAILY_COMPLETIONS
+        )
+
+    async def revoke_user_tokens(self, user_id: str, admin: TokenData) -> None:
+        user = await self.repo.get_user(user_id)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
+            )
+        await revocation_list.revoke_user(user_id)
+
+    async def revoke_all_tokens(self, admin: TokenData) -> None:
+        await revocation_list.revoke_all()
+
+    async def get_metrics(self, admin: TokenData) -> dict:
+        return {
+            "ikigai_classifier": classifier.stats(),
+            "ikigai_category_cache": category_cache.stats(),
+            "calendar_stats_cache": calendar_stats_cache.stats(),
+            "template_catalog_cache": template_catalog_cache.stats(),
+            "user_profile_cache": user_cache.stats(),
+            "password_hasher": password_hasher.stats(),
+            "token_cache": token_cache.stats(),
+            "token_revocation": revocation_list.stats(),
+            "journal_question_scheduler": question_scheduler.stats(),
+        }
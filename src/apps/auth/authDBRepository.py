@@ -1,12 +1,41 @@
-from typing import Optional
-from models.models import User
+from datetime import datetime
+from typing import List, Optional
+from models.models import RevokedToken, User
 
 
 class AuthDBRepository:
     async def find_by_email(self, email: str) -> Optional[User]:
         return await User.find_one(User.email == email)
 
+    async def update_password_hash(self, user_id, old_hash: str, new_hash: str) -> None:
+        # Condicional al hash anterior para no pisar un cambio de contraseña.
+        await User.get_motor_collection().update_one(
+            {"_id": user_id, "hashed_password": old_hash},
+            {"$set": {"hashed_password": new_hash}},
+        )
+
     async def insert_user(self, data: dict) -> User:
         user = User(**data)
         await user.insert()
         return user
+
+    async def add_revocation(
+        self,
+        kind: str,
+        key: str,
+        expires_at: datetime,
+        cutoff: Optional[datetime] = None,
+    ) -> RevokedToken:
+        revocation = RevokedToken(
+            kind=kind, key=key, cutoff=cutoff, expires_at=expires_at
+        )
+        await revocation.insert()
+        return revocation
+
+    async def list_revocations(
+        self, since: Optional[datetime] = None
+    ) -> List[RevokedToken]:
+        query = {"expires_at": {"$gt": datetime.utcnow()}}
+        if since is not None:
+            query["created_at"] = {"$gte": since}
+        return await RevokedToken.find(query).to_list()
@@ -5,12 +5,12 @@ from typing import Dict
 from schemas.roles import UserOut, Token
 from schemas.requests import UserCreate
 
-from utils.auth_utils import (
-    get_password_hash,
-    verify_password,
-    create_access_token,
-)
+from utils.auth_utils import create_access_token
+from utils.password_pool import password_hasher
+from utils.token_cache import VerifiedToken
 from apps.auth.authDBRepository import AuthDBRepository
+from apps.auth.tokenRevocation import revocation_list
+from apps.user.userCache import user_cache
 
 
 class AuthService:
@@ -26,10 +26,13 @@ class AuthService:
                 detail="El correo ya está en uso",
             )
         data = payload.dict()
-        data["hashed_password"] = get_password_hash(data.pop("password"))
+        data["hashed_password"] = await password_hasher.hash(data.pop("password"))
         data["role"] = "user"
         user = await self.repo.insert_user(data)
-        return UserOut.model_dump(user)
+        profile = UserOut.from_orm(user)
+        # Un usuario recién creado todavía no tiene revisión de perfil.
+        user_cache.set(str(user.id), None, profile)
+        return profile
 
     async def login_for_access_token(self, form_data: Dict[str, str]) -> Token:
         email = form_data.get("email")
@@ -40,14 +43,26 @@ class AuthService:
                 detail="Email y contraseña requeridos",
             )
         user = await self.repo.find_by_email(email)
-        if not user or not verify_password(password, user.hashed_password):
+        valid, new_hash = False, None
+        if user:
+            valid, new_hash = await password_hasher.verify_and_update(
+                password, user.hashed_password
+            )
+        if not valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Usuario o contraseña incorrectos",
             )
+        if new_hash:
+            await self.repo.update_password_hash(
+                user.id, user.hashed_password, new_hash
+            )
         access_token_expires = timedelta(minutes=self.expire_minutes)
         access_token = create_access_token(
             data={"sub": str(user.id), "role": user.role},
             expires_delta=access_token_expires,
         )
         return Token(access_token=access_token, token_type="bearer")
+
+    async def logout(self, token: VerifiedToken) -> None:
+        await revocation_list.revoke_token(token)
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from apps.auth.authDBRepository import AuthDBRepository
+from models.models import RevokedToken
+from utils.auth_utils import ACCESS_TOKEN_EXPIRE_MINUTES
+from utils.token_cache import VerifiedToken
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", 5))
+# Margen para no perder revocaciones escritas por workers con el reloj atrasado.
+REVOCATION_SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def _timestamp(value: datetime) -> float:
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+class RevocationList:
+    """Tokens revocados, compartidos entre workers vía ``revoked_tokens``.
+
+    Cada worker guarda una copia en memoria que se revisa en O(1) por request
+    y se sincroniza cada ``REVOCATION_SYNC_SECONDS``; las revocaciones hechas
+    en este worker aplican de inmediato.
+    """
+
+    def __init__(self, interval: float = REVOCATION_SYNC_SECONDS):
+        self.repo = AuthDBRepository()
+        self.interval = interval
+        self._tokens: Dict[str, float] = {}
+        self._users: Dict[str, float] = {}
+        self._all_before = 0.0
+        self._last_sync: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self.last_error: Optional[str] = None
+
+    def is_revoked(self, token: VerifiedToken) -> bool:
+        # iat viene en segundos enteros: un token emitido en el mismo segundo
+        # que un corte por usuario o global también queda revocado.
+        if token.jti in self._tokens:
+            return True
+        if token.issued_at < self._all_before:
+            return True
+        return token.issued_at < self._users.get(token.user.user_id, 0.0)
+
+    def _apply(self, revocation: RevokedToken) -> None:
+        if revocation.kind == "token":
+            self._tokens[revocation.key] = _timestamp(revocation.expires_at)
+        elif revocation.kind == "user":
+            cutoff = _timestamp(revocation.cutoff)
+            self._users[revocation.key] = max(
+                cutoff, self._users.get(revocation.key, 0.0)
+            )
+        elif revocation.kind == "all":
+            self._all_before = max(self._all_before, _timestamp(revocation.cutoff))
+
+    def _prune(self) -> None:
+        now = time.time()
+        self._tokens = {jti: exp for jti, exp in self._tokens.items() if exp > now}
+
+    async def revoke_token(self, token: VerifiedToken) -> None:
+        revocation = await self.repo.add_revocation(
+            "token",
+            token.jti,
+            expires_at=datetime.utcfromtimestamp(token.expires_at),
+        )
+        self._apply(revocation)
+
+    async def _revoke_before_now(self, kind: str, key: str) -> None:
+        now = datetime.utcnow()
+        revocation = await self.repo.add_revocation(
+            kind,
+            key,
+            cutoff=now,
+            expires_at=now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+        )
+        self._apply(revocation)
+
+    async def revoke_user(self, user_id: str) -> None:
+        await self._revoke_before_now("user", user_id)
+
+    async def revoke_all(self) -> None:
+        await self._revoke_before_now("all", "*")
+
+    async def sync(self) -> None:
+        started = datetime.utcnow()
+        since = self._last_sync - REVOCATION_SYNC_OVERLAP if self._last_sync else None
+        for revocation in await self.repo.list_revocations(since):
+            self._apply(revocation)
+        self._prune()
+        self._last_sync = started
+
+    async def start(self) -> None:
+        if self._task is None:
+            await self.sync()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sync()
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.last_error = str(exc)
+                logger.exception("Token revocation sync failed")
+
+    def stats(self) -> dict:
+        return {
+            "revoked_tokens": len(self._tokens),
+            "revoked_users": len(self._users),
+            "all_revoked_before": (
+                datetime.utcfromtimestamp(self._all_before)
+                if self._all_before
+                else None
+            ),
+            "last_sync": self._last_sync,
+            "last_error": self.last_error,
+        }
+
+
+revocation_list = RevocationList()
@@ -0,0 +1,52 @@
+import os
+from datetime import date
+from typing import List, Optional
+
+from models.models import CalendarDayStats
+from utils.cache import StatsCache
+
+CALENDAR_STATS_CACHE_SIZE = int(os.getenv("CALENDAR_STATS_CACHE_SIZE", 10000))
+# Solo libera memoria: las entradas viejas dejan de leerse al cambiar la revisión.
+CALENDAR_STATS_CACHE_TTL_SECONDS = int(
+    os.getenv("CALENDAR_STATS_CACHE_TTL_SECONDS", 3600)
+)
+
+
+def month_key(day: date) -> str:
+    return day.strftime("%Y-%m")
+
+
+class CalendarStatsCache:
+    """Estadísticas del calendario por (usuario, revisión, mes).
+
+    La revisión es la de ``revisions.DAILY_COMPLETIONS`` del usuario, que se
+    guarda en Mongo: una escritura en cualquier worker la cambia y todos los
+    workers dejan de usar lo que tenían cacheado sin invalidar nada aquí.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = CALENDAR_STATS_CACHE_SIZE,
+        ttl: int = CALENDAR_STATS_CACHE_TTL_SECONDS,
+    ):
+        self.memory = StatsCache(maxsize=maxsize, ttl=ttl)
+
+    def get(
+        self, user_id: str, revision: Optional[str], month: str
+    ) -> Optional[List[CalendarDayStats]]:
+        return self.memory.get((user_id, revision, month))
+
+    def set(
+        self,
+        user_id: str,
+        revision: Optional[str],
+        month: str,
+        stats: List[CalendarDayStats],
+    ) -> None:
+        self.memory.set((user_id, revision, month), stats)
+
+    def stats(self) -> dict:
+        return self.memory.stats()
+
+
+calendar_stats_cache = CalendarStatsCache()
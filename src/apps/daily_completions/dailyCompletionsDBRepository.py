@@ -0,0 +1,375 @@
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from models.models import DailyCompletions
+
+
+def as_datetime(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time())
+
+
+# Recalcula los totales del día a partir de "completions" dentro de Mongo.
+RECOMPUTE_DAY_TOTALS = {
+    "$set": {
+        "overall_percentage": {
+            "$cond": [
+                {"$gt": [{"$size": "$completions"}, 0]},
+                {"$avg": "$completions.percentage"},
+                0.0,
+            ]
+        },
+        "day_completed": {
+            "$cond": [
+                {"$gt": [{"$size": "$completions"}, 0]},
+                {"$allElementsTrue": ["$completions.completed"]},
+                False,
+            ]
+        },
+    }
+}
+
+
+# percentage = progress / goal.target (1 si el target no es positivo) y
+# completed al 100%.
+def set_entry_progress(habit_id: ObjectId, progress: float) -> dict:
+    target = "$$c.goal.target"
+    percentage = {
+        "$divide": [
+            progress,
+            {"$cond": [{"$gt": [{"$ifNull": [target, 0]}, 0]}, target, 1]},
+        ]
+    }
+    return {
+        "$set": {
+            "completions": {
+                "$map": {
+                    "input": "$completions",
+                    "as": "c",
+                    "in": {
+                        "$cond": [
+                            {"$eq": ["$$c.habit_id", habit_id]},
+                            {
+                                "$let": {
+                                    "vars": {"pct": percentage},
+                                    "in": {
+                                        "$mergeObjects": [
+                                            "$$c",
+                                            {
+                                                "progress": progress,
+                                                "percentage": "$$pct",
+                                                "completed": {"$gte": ["$$pct", 1]},
+                                            },
+                                        ]
+                                    },
+                                }
+                            },
+                            "$$c",
+                        ]
+                    },
+                }
+            }
+        }
+    }
+
+
+class DailyCompletionsDBRepository:
+    async def list_for_range(
+        self, user_id: str, start: date, end: date
+    ) -> List[DailyCompletions]:
+        return (
+            await DailyCompletions.find(
+                DailyCompletions.user_id == ObjectId(user_id),
+                DailyCompletions.date >= start,
+                DailyCompletions.date < end,
+            )
+            .sort(+DailyCompletions.date)
+            .to_list()
+        )
+
+    async def list_raw_for_range(
+        self,
+        user_id: str,
+        start: date,
+        end: date,
+        fields: List[str],
+        limit: int = 0,
+        after: Optional[datetime] = None,
+    ) -> List[dict]:
+        """Días en [start, end) por fecha; con ``after`` empieza después de
+        ese día (el índice único garantiza un documento por fecha)."""
+        window = {"$gte": as_datetime(start), "$lt": as_datetime(end)}
+        if after is not None:
+            window["$gt"] = after
+        cursor = (
+            DailyCompletions.get_motor_collection()
+            .find(
+                {"user_id": ObjectId(user_id), "date": window},
+                {field: 1 for field in fields},
+            )
+            .sort("date", ASCENDING)
+            .limit(limit)
+        )
+        return await cursor.to_list(None)
+
+    async def calendar_stats(self, user_id: str, start: date, end: date) -> List[dict]:
+        """Resumen por día (completados, total y tasa) calculado en Mongo."""
+        total = {"$size": "$completions"}
+        pipeline = [
+            {
+                "$match": {
+                    "user_id": ObjectId(user_id),
+                    "date": {"$gte": as_datetime(start), "$lt": as_datetime(end)},
+                }
+            },
+            {"$sort": {"date": ASCENDING}},
+            {
+                "$project": {
+                    "_id": 0,
+                    "day": "$date",
+                    "total_habits": total,
+                    "completed_count": {
+                        "$size": {
+                            "$filter": {
+                                "input": "$completions",
+                                "as": "c",
+                                "cond": "$$c.completed",
+                            }
+                        }
+                    },
+                }
+            },
+            {
+                "$set": {
+                    "completion_rate": {
+                        "$cond": [
+                            {"$gt": ["$total_habits", 0]},
+                            {"$divide": ["$completed_count", "$total_habits"]},
+                            0.0,
+                        ]
+                    }
+                }
+            },
+        ]
+        cursor = DailyCompletions.get_motor_collection().aggregate(pipeline)
+        return await cursor.to_list(None)
+
+    async def habit_totals(
+        self, user_id: str, start: Optional[date] = None, end: Optional[date] = None
+    ) -> List[dict]:
+        """Días registrados y completados por hábito, en una sola agregación.
+
+        ``end`` es exclusivo, igual que en ``list_for_range``.
+        """
+        match = {"user_id": ObjectId(user_id)}
+        window = {}
+        if start is not None:
+            window["$gte"] = as_datetime(start)
+        if end is not None:
+            window["$lt"] = as_datetime(end)
+        if window:
+            match["date"] = window
+        pipeline = [
+            {"$match": match},
+            {"$project": {"_id": 0, "completions": 1}},
+            {"$unwind": "$completions"},
+            {
+                "$group": {
+                    "_id": "$completions.habit_id",
+                    "total_days": {"$sum": 1},
+                    "completed_days": {
+                        "$sum": {"$cond": ["$completions.completed", 1, 0]}
+                    },
+                }
+            },
+        ]
+        cursor = DailyCompletions.get_motor_collection().aggregate(pipeline)
+        return await cursor.to_list(None)
+
+    async def remove_habit(self, user_id: str, habit_id: str) -> int:
+        habit_oid = ObjectId(habit_id)
+        result = await DailyCompletions.get_motor_collection().update_many(
+            {"user_id": ObjectId(user_id), "completions.habit_id": habit_oid},
+            [
+                {
+                    "$set": {
+                        "completions": {
+                            "$filter": {
+                                "input": "$completions",
+                                "cond": {"$ne": ["$$this.habit_id", habit_oid]},
+                            }
+                        }
+                    }
+                },
+                RECOMPUTE_DAY_TOTALS,
+            ],
+        )
+        return result.modified_count
+
+    async def exists(self, user_id: str, day: date) -> bool:
+        doc = await DailyCompletions.get_motor_collection().find_one(
+            {"user_id": ObjectId(user_id), "date": as_datetime(day)}, {"_id": 1}
+        )
+        return doc is not None
+
+    async def update_entry_progress(
+        self,
+        user_id: str,
+        day: date,
+        habit_id: str,
+        progress: float,
+        was_completed: bool,
+    ) -> Optional[dict]:
+        """Actualiza la entrada en una sola operación atómica si antes estaba
+        completada (``was_completed``) o no.
+
+        Devuelve el documento ya actualizado, o None si el día no tiene una
+        entrada para el hábito en ese estado.
+        """
+        habit_oid = ObjectId(habit_id)
+        completed = True if was_completed else {"$ne": True}
+        return await DailyCompletions.get_motor_collection().find_one_and_update(
+            {
+                "user_id": ObjectId(user_id),
+                "date": as_datetime(day),
+                "completions": {
+                    "$elemMatch": {"habit_id": habit_oid, "completed": completed}
+                },
+            },
+            [set_entry_progress(habit_oid, float(progress)), RECOMPUTE_DAY_TOTALS],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def append_entry(
+        self, user_id: str, day: date, entry: dict, progress: float
+    ) -> Optional[dict]:
+        """Agrega la entrada con ``progress`` ya aplicado, o None si el día no
+        existe o ya tiene una entrada para el hábito."""
+        return await DailyCompletions.get_motor_collection().find_one_and_update(
+            {
+                "user_id": ObjectId(user_id),
+                "date": as_datetime(day),
+                "completions.habit_id": {"$ne": entry["habit_id"]},
+            },
+            [
+                {
+                    "$set": {
+                        "completions": {
+                            "$concatArrays": ["$completions", {"$literal": [entry]}]
+                        }
+                    }
+                },
+                set_entry_progress(entry["habit_id"], float(progress)),
+                RECOMPUTE_DAY_TOTALS,
+            ],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def delete_day(self, user_id: str, day_id: str) -> Optional[DailyCompletions]:
+        doc = await DailyCompletions.get_motor_collection().find_one_and_delete(
+            {"_id": ObjectId(day_id), "user_id": ObjectId(user_id)}
+        )
+        return DailyCompletions.model_validate(doc) if doc else None
+
+    async def get_day(self, user_id: str, day: date) -> Optional[DailyCompletions]:
+        return await DailyCompletions.find_one(
+            DailyCompletions.user_id == ObjectId(user_id), DailyCompletions.date == day
+        )
+
+    async def get_day_raw(self, user_id: str, day: date) -> Optional[dict]:
+        return await DailyCompletions.get_motor_collection().find_one(
+            {"user_id": ObjectId(user_id), "date": as_datetime(day)}
+        )
+
+    async def upsert_day(
+        self, user_id: str, day: date, completions: List[dict]
+    ) -> Tuple[DailyCompletions, bool]:
+        """Crea el día si no existe y devuelve el documento guardado.
+
+        Con el índice único de (user_id, date) dos upserts concurrentes
+        terminan en un solo documento; el perdedor lee el del ganador. El
+        segundo valor indica si este llamado fue el que lo creó.
+        """
+        collection = DailyCompletions.get_motor_collection()
+        query = {"user_id": ObjectId(user_id), "date": as_datetime(day)}
+        fields = {
+            "completions": completions,
+            "overall_percentage": (
+                sum(c["percentage"] for c in completions) / len(completions)
+                if completions
+                else 0.0
+            ),
+            "day_completed": False,
+        }
+        try:
+            result = await collection.update_one(
+                query, {"$setOnInsert": fields}, upsert=True
+            )
+        except DuplicateKeyError:
+            result = None
+        if result is not None and result.upserted_id is not None:
+            doc = {"_id": result.upserted_id, **query, **fields}
+            return DailyCompletions.model_validate(doc), True
+        return DailyCompletions.model_validate(await collection.find_one(query)), False
+
+    async def insert_days(
+        self, user_id: str, days: Dict[date, List[dict]]
+    ) -> Tuple[List[DailyCompletions], bool]:
+        """Inserta varios días nuevos con un solo ``insert_many``.
+
+        Devuelve los días insertados y si hubo conflicto: si otro request creó
+        alguno entre medio, ese queda fuera y el llamador debe releer.
+        """
+        docs = [
+            {
+                "user_id": ObjectId(user_id),
+                "date": as_datetime(day),
+                "completions": completions,
+                "overall_percentage": 0.0,
+                "day_completed": False,
+            }
+            for day, completions in days.items()
+        ]
+        if not docs:
+            return [], False
+        failed = set()
+        try:
+            await DailyCompletions.get_motor_collection().insert_many(
+                docs, ordered=False
+            )
+        except BulkWriteError as exc:
+            errors = exc.details.get("writeErrors", [])
+            if any(error.get("code") != 11000 for error in errors):
+                raise
+            failed = {error["index"] for error in errors}
+        created = [
+            DailyCompletions.model_validate(doc)
+            for i, doc in enumerate(docs)
+            if i not in failed
+        ]
+        return created, bool(failed)
+
+    async def remove_duplicate_days(self) -> int:
+        """Deja un documento por (user_id, date): el de mayor avance."""
+        collection = DailyCompletions.get_motor_collection()
+        duplicates = collection.aggregate(
+            [
+                {"$sort": {"overall_percentage": -1, "_id": 1}},
+                {
+                    "$group": {
+                        "_id": {"user_id": "$user_id", "date": "$date"},
+                        "ids": {"$push": "$_id"},
+                    }
+                },
+                {"$match": {"ids.1": {"$exists": True}}},
+            ],
+            allowDiskUse=True,
+        )
+        removed = 0
+        async for group in duplicates:
+            result = await collection.delete_many({"_id": {"$in": group["ids"][1:]}})
+            removed += result.deleted_count
+        return removed
@@ -0,0 +1,353 @@
+import os
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple, Union
+
+from bson import ObjectId
+from fastapi import HTTPException, status
+
+from apps.daily_completions.calendarStatsCache import calendar_stats_cache, month_key
+from apps.daily_completions.dailyCompletionsDBRepository import (
+    DailyCompletionsDBRepository,
+)
+from apps.habits.habitRollupDBRepository import HabitRollupDBRepository
+from apps.habits.habitsDBRepository import HabitsRepository
+from apps.user.userDBRepository import UserDBRepository
+from models.models import (
+    CalendarDayStats,
+    DailyCompletions,
+    Goal,
+    Habit,
+    UpdateProgressInput,
+)
+from utils import revisions
+from utils.pagination import decode_cursor, encode_cursor
+from utils.singleflight import SingleFlight
+
+MAX_RANGE_DAYS = int(os.getenv("DAILY_COMPLETIONS_MAX_RANGE_DAYS", 62))
+MAX_STATS_RANGE_DAYS = int(os.getenv("CALENDAR_STATS_MAX_RANGE_DAYS", 366))
+MONTH_DAYS = 31
+
+GOAL_FIELDS = tuple(Goal.model_fields)
+
+PROJECTABLE_FIELDS = {
+    "user_id",
+    "date",
+    "completions",
+    "overall_percentage",
+    "day_completed",
+}
+
+
+def _month_bounds(month: str):
+    try:
+        start = datetime.strptime(month, "%Y-%m").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El mes debe tener formato YYYY-MM",
+        )
+    return start, _next_month(start)
+
+
+def _next_month(day: date) -> date:
+    if day.month == 12:
+        return date(day.year + 1, 1, 1)
+    return date(day.year, day.month + 1, 1)
+
+
+def _range_days(start: date, end: date, limit: int = MAX_RANGE_DAYS) -> List[date]:
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha final debe ser igual o posterior a la inicial",
+        )
+    span = (end - start).days + 1
+    if span > limit:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"El rango no puede superar {limit} días",
+        )
+    return [start + timedelta(days=i) for i in range(span)]
+
+
+def _parse_fields(fields: str) -> List[str]:
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    invalid = [f for f in requested if f not in PROJECTABLE_FIELDS]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campos no permitidos: {', '.join(invalid)}",
+        )
+    # La fecha siempre viaja para que el cliente pueda ubicar cada día.
+    return sorted(set(requested) | {"date"})
+
+
+def _jsonable(value, key: Optional[str] = None):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime) and key == "date":
+        return value.date().isoformat()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {k: _jsonable(v, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_jsonable(v) for v in value]
+    return value
+
+
+def day_row(doc: dict) -> dict:
+    """Documento crudo de ``daily_completions`` con la forma JSON que tenía
+    el documento de Beanie."""
+    return {
+        "_id": str(doc["_id"]),
+        "user_id": str(doc["user_id"]),
+        "date": doc["date"].date(),
+        "completions": [
+            {
+                "habit_id": str(entry["habit_id"]),
+                "title": entry["title"],
+                "goal": {key: entry["goal"][key] for key in GOAL_FIELDS},
+                "progress": float(entry["progress"]),
+                "percentage": float(entry["percentage"]),
+                "completed": entry["completed"],
+            }
+            for entry in doc["completions"]
+        ],
+        "overall_percentage": float(doc["overall_percentage"]),
+        "day_completed": doc.get("day_completed", False),
+    }
+
+
+def entry_completed(doc: dict, habit_id: str) -> bool:
+    return next(
+        entry["completed"]
+        for entry in doc["completions"]
+        if str(entry["habit_id"]) == habit_id
+    )
+
+
+def new_entry(habit: Habit) -> dict:
+    return {
+        "habit_id": habit.id,
+        "title": habit.title,
+        "goal": habit.goal.model_dump(),
+        "progress": 0.0,
+        "percentage": 0.0,
+        "completed": False,
+    }
+
+
+class DailyCompletionsService:
+    def __init__(self):
+        self.repo = DailyCompletionsDBRepository()
+        self.user_repo = UserDBRepository()
+        self.habits_repo = HabitsRepository()
+        self.rollup_repo = HabitRollupDBRepository()
+        self._materialize_flight = SingleFlight()
+
+    async def get_or_create_day(
+        self, user_id: str, day: date
+    ) -> Union[DailyCompletions, list]:
+        existing = await self.repo.get_day(user_id, day)
+        if existing:
+            return existing
+        return await self._materialize_flight.do(
+            (user_id, day), lambda: self._materialize_day(user_id, day)
+        )
+
+    async def _materialize_day(
+        self, user_id: str, day: date
+    ) -> Union[DailyCompletions, list]:
+        habits = await self.habits_repo.list_user_habits_for_weekday(
+            user_id, day.strftime("%a")
+        )
+        if not habits:
+            return []
+        dc, created = await self.repo.upsert_day(
+            user_id, day, [new_entry(h) for h in habits]
+        )
+        if created:
+            await self.rollup_repo.add_days(user_id, {h.id: 1 for h in habits})
+            await revisions.bump(user_id, revisions.DAILY_COMPLETIONS)
+        return dc
+
+    async def get_or_create_range(
+        self, user_id: str, start: date, end: date
+    ) -> List[DailyCompletions]:
+        """Devuelve los días de ``start`` a ``end`` (inclusive), creando los que
+        falten con una sola lectura de hábitos y un solo ``insert_many``.
+
+        Igual que en ``get_or_create_day``, los días sin hábitos no se crean.
+        """
+        days = _range_days(start, end)
+        stop = end + timedelta(days=1)
+        existing = await self.repo.list_for_range(user_id, start, stop)
+        have = {dc.date for dc in existing}
+        missing = [day for day in days if day not in have]
+        if not missing:
+            return existing
+
+        by_weekday = {}
+        for habit in await self.habits_repo.list_user_habits(user_id):
+            for weekday in habit.task_days:
+                by_weekday.setdefault(weekday, []).append(new_entry(habit))
+        to_create = {
+            day: by_weekday[day.strftime("%a")]
+            for day in missing
+            if by_weekday.get(day.strftime("%a"))
+        }
+        if not to_create:
+            return existing
+
+        created, conflict = await self.repo.insert_days(user_id, to_create)
+        habit_days = {}
+        for dc in created:
+            for entry in dc.completions:
+                habit_days[entry.habit_id] = habit_days.get(entry.habit_id, 0) + 1
+        await self.rollup_repo.add_days(user_id, habit_days)
+        if created:
+            await revisions.bump(user_id, revisions.DAILY_COMPLETIONS)
+        if conflict:
+            # Otro request creó alguno de los días; se relee el rango completo.
+            return await self.repo.list_for_range(user_id, start, stop)
+        return sorted(existing + created, key=lambda dc: dc.date)
+
+    async def get_day_view(self, user_id: str, day: date) -> Optional[dict]:
+        doc = await self.repo.get_day_raw(user_id, day)
+        return day_row(doc) if doc else None
+
+    async def get_month(
+        self,
+        user_id: str,
+        month: str,
+        fields: Optional[str] = None,
+        limit: int = MONTH_DAYS,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Devuelve una página de días del mes y el cursor de la siguiente.
+
+        Con el límite por defecto el mes completo cabe en una sola página.
+        """
+        start, end = _month_bounds(month)
+        after = decode_cursor(cursor, 1)[0] if cursor else None
+        projection = _parse_fields(fields) if fields else sorted(PROJECTABLE_FIELDS)
+        docs = await self.repo.list_raw_for_range(
+            user_id, start, end, projection, limit=limit + 1, after=after
+        )
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor([docs[-1]["date"]])
+        if not fields:
+            return [day_row(doc) for doc in docs], next_cursor
+        return [_jsonable(doc) for doc in docs], next_cursor
+
+    async def get_calendar_stats(
+        self, user_id: str, start: date, end: date
+    ) -> List[CalendarDayStats]:
+        """Estadísticas por día entre ``start`` y ``end`` (inclusive).
+
+        Se cachean por mes completo; los meses que falten se calculan juntos
+        en una sola agregación.
+        """
+        _range_days(start, end, MAX_STATS_RANGE_DAYS)
+        months = []
+        month = start.replace(day=1)
+        while month <= end:
+            months.append(month)
+            month = _next_month(month)
+
+        scope = revisions.DAILY_COMPLETIONS
+        revision = (await revisions.current(user_id, [scope])).get(scope)
+        by_month = {}
+        missing = []
+        for month in months:
+            cached = calendar_stats_cache.get(user_id, revision, month_key(month))
+            if cached is None:
+                missing.append(month)
+            else:
+                by_month[month_key(month)] = cached
+
+        if missing:
+            computed = {month_key(month): [] for month in missing}
+            rows = await self.repo.calendar_stats(
+                user_id, missing[0], _next_month(missing[-1])
+            )
+            for row in rows:
+                key = month_key(row["day"])
+                if key in computed:
+                    computed[key].append(CalendarDayStats.model_validate(row))
+            for key, stats in computed.items():
+                calendar_stats_cache.set(user_id, revision, key, stats)
+            by_month.update(computed)
+
+        return [
+            stats
+            for month in months
+            for stats in by_month[month_key(month)]
+            if start <= stats.day <= end
+        ]
+
+    async def delete_day(self, user_id: str, day_id: str) -> None:
+        dc = await self.repo.delete_day(user_id, day_id)
+        if dc is None:
+            return
+        await self.rollup_repo.remove_day(dc)
+        await revisions.bump(user_id, revisions.DAILY_COMPLETIONS)
+
+    async def update_progress(
+        self, user_id: str, data: UpdateProgressInput
+    ) -> DailyCompletions:
+        dc, was_completed, completed = await self._apply_progress(user_id, data)
+
+        if was_completed is None or was_completed != completed:
+            await self.rollup_repo.record_entry(
+                user_id,
+                data.habit_id,
+                data.date,
+                days=1 if was_completed is None else 0,
+                completed=int(completed) - int(bool(was_completed)),
+            )
+        changed = [revisions.DAILY_COMPLETIONS]
+        if completed and not was_completed:
+            if await self.user_repo.update_streak(user_id, date.today()):
+                changed.append(revisions.PROFILE)
+        await revisions.bump(user_id, *changed)
+
+        return dc
+
+    async def _apply_progress(
+        self, user_id: str, data: UpdateProgressInput
+    ) -> Tuple[DailyCompletions, Optional[bool], bool]:
+        """Devuelve el día actualizado, si la entrada estaba completada antes
+        (``None`` si no existía y se agregó) y si lo está ahora."""
+        while True:
+            # El estado previo va en el filtro: el update que calza lo fija y el
+            # documento devuelto trae el resultado calculado por Mongo.
+            for was_completed in (False, True):
+                doc = await self.repo.update_entry_progress(
+                    user_id, data.date, data.habit_id, data.progress, was_completed
+                )
+                if doc is not None:
+                    dc = DailyCompletions.model_validate(doc)
+                    return dc, was_completed, entry_completed(doc, data.habit_id)
+
+            if not await self.repo.exists(user_id, data.date):
+                raise HTTPException(
+                    status_code=404, detail="DailyCompletions not found"
+                )
+
+            habit = await Habit.find_one(
+                {"_id": ObjectId(data.habit_id), "owner_id": ObjectId(user_id)}
+            )
+            if not habit:
+                raise HTTPException(status_code=404, detail="Habit not found")
+
+            doc = await self.repo.append_entry(
+                user_id, data.date, new_entry(habit), data.progress
+            )
+            if doc is not None:
+                dc = DailyCompletions.model_validate(doc)
+                return dc, None, entry_completed(doc, data.habit_id)
+            # Otro request agregó la entrada entre medio; se actualiza esa.
@@ -0,0 +1,200 @@
+from datetime import date
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from apps.daily_completions.dailyCompletionsDBRepository import as_datetime
+from models.models import DailyCompletions, Habit, HabitRollup
+
+
+def _totals_pipeline(match: dict, habit_id: Optional[ObjectId] = None) -> List[dict]:
+    pipeline = [
+        {"$match": match},
+        {"$project": {"_id": 0, "user_id": 1, "date": 1, "completions": 1}},
+        {"$unwind": "$completions"},
+    ]
+    if habit_id is not None:
+        pipeline.append({"$match": {"completions.habit_id": habit_id}})
+    return pipeline + [
+        {
+            "$group": {
+                "_id": "$completions.habit_id",
+                "owner_id": {"$first": "$user_id"},
+                "total_days": {"$sum": 1},
+                "completed_days": {"$sum": {"$cond": ["$completions.completed", 1, 0]}},
+                "last_completed": {
+                    "$max": {"$cond": ["$completions.completed", "$date", None]}
+                },
+            }
+        },
+    ]
+
+
+def _set_totals(row: dict) -> UpdateOne:
+    return UpdateOne(
+        {"habit_id": row["_id"]},
+        {
+            "$set": {
+                "owner_id": row["owner_id"],
+                "total_days": row["total_days"],
+                "completed_days": row["completed_days"],
+                "last_completed": row["last_completed"],
+            }
+        },
+        upsert=True,
+    )
+
+
+class HabitRollupDBRepository:
+    async def list_for_owner(self, owner_id: str) -> List[HabitRollup]:
+        return await HabitRollup.find(
+            HabitRollup.owner_id == ObjectId(owner_id)
+        ).to_list()
+
+    async def create(self, habit_id, owner_id) -> None:
+        try:
+            await HabitRollup(
+                habit_id=ObjectId(habit_id), owner_id=ObjectId(owner_id)
+            ).insert()
+        except DuplicateKeyError:
+            pass
+
+    async def remove(self, habit_id: str) -> None:
+        await HabitRollup.get_motor_collection().delete_one(
+            {"habit_id": ObjectId(habit_id)}
+        )
+
+    async def _existing(self, habit_ids) -> set:
+        if not habit_ids:
+            return set()
+        cursor = HabitRollup.get_motor_collection().find(
+            {"habit_id": {"$in": list(habit_ids)}}, {"_id": 0, "habit_id": 1}
+        )
+        return {doc["habit_id"] async for doc in cursor}
+
+    async def add_days(self, owner_id: str, habit_days: Dict[ObjectId, int]) -> None:
+        """Suma días programados (aún sin completar) a cada hábito.
+
+        Los hábitos sin rollup se recalculan completos: ``daily_completions``
+        ya incluye los días recién creados.
+        """
+        if not habit_days:
+            return
+        existing = await self._existing(habit_days)
+        updates = [
+            UpdateOne(
+                {"habit_id": habit_id},
+                {"$inc": {"total_days": days, "completed_days": 0}},
+            )
+            for habit_id, days in habit_days.items()
+            if habit_id in existing
+        ]
+        if updates:
+            await HabitRollup.get_motor_collection().bulk_write(updates, ordered=False)
+        for habit_id in habit_days:
+            if habit_id not in existing:
+                await self.recompute(owner_id, habit_id)
+
+    async def record_entry(
+        self,
+        owner_id: str,
+        habit_id,
+        day: date,
+        days: int = 0,
+        completed: int = 0,
+    ) -> None:
+        """Aplica el cambio de una entrada: ``days`` y ``completed`` son deltas.
+
+        Si el hábito no tiene rollup, o se descompleta el último día
+        completado, los deltas no alcanzan y se recalcula ese hábito desde
+        ``daily_completions`` (que ya tiene el cambio).
+        """
+        habit_oid = ObjectId(habit_id)
+        update = {"$inc": {"total_days": days, "completed_days": completed}}
+        if completed > 0:
+            update["$max"] = {"last_completed": as_datetime(day)}
+        before = await HabitRollup.get_motor_collection().find_one_and_update(
+            {"habit_id": habit_oid}, update
+        )
+        if before is None or (
+            completed < 0 and before.get("last_completed") == as_datetime(day)
+        ):
+            await self.recompute(owner_id, habit_oid)
+
+    async def remove_day(self, doc: DailyCompletions) -> None:
+        """Descuenta un día borrado de los hábitos que tenía."""
+        for entry in doc.completions:
+            await self.record_entry(
+                str(doc.user_id),
+                entry.habit_id,
+                doc.date,
+                days=-1,
+                completed=-1 if entry.completed else 0,
+            )
+
+    async def recompute(self, owner_id: str, habit_id) -> None:
+        habit_oid = ObjectId(habit_id)
+        match = {"user_id": ObjectId(owner_id), "completions.habit_id": habit_oid}
+        rows = await (
+            DailyCompletions.get_motor_collection()
+            .aggregate(_totals_pipeline(match, habit_oid))
+            .to_list(None)
+        )
+        if rows:
+            row = rows[0]
+        else:
+            row = {
+                "_id": habit_oid,
+                "owner_id": ObjectId(owner_id),
+                "total_days": 0,
+                "completed_days": 0,
+                "last_completed": None,
+            }
+        await HabitRollup.get_motor_collection().bulk_write([_set_totals(row)])
+
+    async def rebuild(self) -> int:
+        """Recalcula todos los rollups desde ``daily_completions``.
+
+        Los hábitos sin días quedan en cero y se borran los rollups de
+        hábitos que ya no existen. Devuelve cuántos rollups quedaron.
+        """
+        collection = HabitRollup.get_motor_collection()
+        seen = set()
+        batch = []
+        cursor = DailyCompletions.get_motor_collection().aggregate(
+            _totals_pipeline({}), allowDiskUse=True
+        )
+        async for row in cursor:
+            seen.add(row["_id"])
+            batch.append(_set_totals(row))
+            if len(batch) >= 1000:
+                await collection.bulk_write(batch, ordered=False)
+                batch = []
+
+        habits = Habit.get_motor_collection().find({}, {"_id": 1, "owner_id": 1})
+        existing = set()
+        async for habit in habits:
+            existing.add(habit["_id"])
+            if habit["_id"] in seen:
+                continue
+            batch.append(
+                _set_totals(
+                    {
+                        "_id": habit["_id"],
+                        "owner_id": habit["owner_id"],
+                        "total_days": 0,
+                        "completed_days": 0,
+                        "last_completed": None,
+                    }
+                )
+            )
+            if len(batch) >= 1000:
+                await collection.bulk_write(batch, ordered=False)
+                batch = []
+        if batch:
+            await collection.bulk_write(batch, ordered=False)
+
+        await collection.delete_many({"habit_id": {"$nin": list(existing)}})
+        return len(existing)
@@ -0,0 +1,70 @@
+import hashlib
+import os
+import unicodedata
+from typing import Optional
+
+from apps.habits.habitsDBRepository import HabitsRepository
+from utils.cache import StatsCache
+
+CATEGORY_CACHE_SIZE = int(os.getenv("IKIGAI_CACHE_SIZE", 10000))
+CATEGORY_CACHE_TTL_SECONDS = int(os.getenv("IKIGAI_CACHE_TTL_SECONDS", 24 * 3600))
+
+CATEGORY_KEY_FIELDS = ("title", "description", "group", "type")
+
+
+def _normalize(value) -> str:
+    text = unicodedata.normalize("NFKD", str(value or ""))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.lower().split())
+
+
+def category_key(data: dict) -> str:
+    parts = [_normalize(data.get(field)) for field in CATEGORY_KEY_FIELDS]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class HabitCategoryCache:
+    """Cache de categorías ikigai: LRU en memoria y colección compartida en Mongo."""
+
+    def __init__(
+        self,
+        maxsize: int = CATEGORY_CACHE_SIZE,
+        ttl: int = CATEGORY_CACHE_TTL_SECONDS,
+    ):
+        self.repo = HabitsRepository()
+        self.memory = StatsCache(maxsize=maxsize, ttl=ttl)
+        self.db_hits = 0
+        self.db_misses = 0
+
+    async def get(self, data: dict) -> Optional[str]:
+        key = category_key(data)
+        category = self.memory.get(key)
+        if category is not None:
+            return category
+
+        category = await self.repo.get_cached_category(key)
+        if category is None:
+            self.db_misses += 1
+            return None
+        self.db_hits += 1
+        self.memory.set(key, category)
+        return category
+
+    async def set(self, data: dict, category: str) -> None:
+        key = category_key(data)
+        self.memory.set(key, category)
+        await self.repo.save_cached_category(key, category)
+
+    def stats(self) -> dict:
+        lookups = self.db_hits + self.db_misses
+        return {
+            "memory": self.memory.stats(),
+            "db": {
+                "hits": self.db_hits,
+                "misses": self.db_misses,
+                "hit_rate": round(self.db_hits / lookups, 4) if lookups else 0.0,
+            },
+        }
+
+
+category_cache = HabitCategoryCache()
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import os
+import time
+from typing import List, Optional
+
+from apps.habits.habitsCategoryCache import CATEGORY_KEY_FIELDS, category_cache
+from apps.habits.habitsDBRepository import HabitsRepository
+from apps.habits.templateCatalogCache import template_catalog_cache
+from utils import revisions
+from utils.gemini_util import get_gemini_model
+
+PENDING_CATEGORY = "pending"
+DEFAULT_CATEGORY = "mission"
+VALID_CATEGORIES = {"passion", "vocation", "mission", "profession"}
+
+CLASSIFIER_WORKERS = int(os.getenv("IKIGAI_CLASSIFIER_WORKERS", 4))
+CLASSIFIER_QUEUE_SIZE = int(os.getenv("IKIGAI_CLASSIFIER_QUEUE_SIZE", 1000))
+
+logger = logging.getLogger(__name__)
+
+
+def build_classification_prompt(data: dict) -> str:
+    return (
+        "Toma el rol de un analista que revisa y asigna una categoria de las"
+        " aristas"
+        " de el ikigai."
+        "Te entregaré la descripción de un habito a mejorar por un usuario y"
+        " lo tienes que categorizar en solo un"
+        "area del ikigai."
+        "Las categorías posibles son: "
+        "- passion "
+        "- vocation"
+        "- mission"
+        "- profession"
+        "Tienes que solo contestar con la categoría asignada,"
+        " SIN NINGUNA OTRA PALABRA."
+        "Es necesario que las palabras estén minusculas o sino me van a matar"
+        "y tal como te las escribí."
+        "El hábito a categorizar es el siguiente:"
+        f'title: {data.get("title")}'
+        f'description: {data.get("description")}'
+        f'group: {data.get("group")}'
+        f'type {data.get("type")}'
+    )
+
+
+class HabitClassifier:
+    """Clasifica hábitos en segundo plano con un número acotado de workers.
+
+    Los hábitos se insertan con la categoría ``pending`` y el worker escribe
+    ``ikigai_category`` cuando Gemini responde.
+    """
+
+    def __init__(
+        self, workers: int = CLASSIFIER_WORKERS, maxsize: int = CLASSIFIER_QUEUE_SIZE
+    ):
+        self.repo = HabitsRepository()
+        self.workers = workers
+        self.maxsize = maxsize
+        # Se crea en start() para quedar ligada al loop que corre los workers.
+        self.queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self.enqueued = 0
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._total_lag = 0.0
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self.queue = queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [
+            asyncio.create_task(self._worker(queue)) for _ in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.queue = None
+
+    def enqueue(
+        self, target_id, data: dict, kind: str = "habit", owner_id=None
+    ) -> bool:
+        job = {
+            "kind": kind,
+            "target_id": target_id,
+            # Dueño del hábito, para invalidar sus GET condicionales.
+            "owner_id": owner_id,
+            "data": {k: data.get(k) for k in CATEGORY_KEY_FIELDS},
+            "enqueued_at": time.monotonic(),
+        }
+        try:
+            if self.queue is None:
+                raise asyncio.QueueFull
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            # El hábito queda en "pending" y se reencola al reiniciar.
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    async def requeue_pending(self) -> int:
+        limit = self.maxsize or None
+        habits = await self.repo.list_habits_by_category(PENDING_CATEGORY, limit=limit)
+        templates = await self.repo.list_templates_without_category()
+        count = 0
+        for habit in habits:
+            if self.enqueue(habit.id, habit.model_dump(), owner_id=habit.owner_id):
+                count += 1
+        for tmpl in templates:
+            if self.enqueue(tmpl.id, tmpl.model_dump(), kind="template"):
+                count += 1
+        return count
+
+    async def classify(self, data: dict) -> Optional[str]:
+        client = get_gemini_model()
+        try:
+            response = await client.aio.models.generate_content(
+                model="gemini-2.5-flash", contents=build_classification_prompt(data)
+            )
+        except Exception:
+            return None
+
+        category = (response.text or "").strip().lower()
+        return category if category in VALID_CATEGORIES else None
+
+    async def _resolve(self, data: dict) -> str:
+        category = await category_cache.get(data)
+        if category is not None:
+            return category
+
+        category = await self.classify(data)
+        if category is None:
+            # Los fallos no se guardan en cache para reintentar con otro hábito.
+            return DEFAULT_CATEGORY
+        await category_cache.set(data, category)
+        return category
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            job = await queue.get()
+            try:
+                category = await self._resolve(job["data"])
+                if job["kind"] == "template":
+                    await self.repo.set_template_category(job["target_id"], category)
+                    await template_catalog_cache.invalidate()
+                else:
+                    await self.repo.set_ikigai_category(
+                        job["target_id"], category, only_if=PENDING_CATEGORY
+                    )
+                    if job["owner_id"] is not None:
+                        await revisions.bump(job["owner_id"], revisions.HABITS)
+                self.processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.failed += 1
+                logger.exception(
+                    "Ikigai classification failed for %s", job["target_id"]
+                )
+            finally:
+                lag = time.monotonic() - job["enqueued_at"]
+                self.last_lag = lag
+                self.max_lag = max(self.max_lag, lag)
+                self._total_lag += lag
+                queue.task_done()
+
+    def stats(self) -> dict:
+        finished = self.processed + self.failed
+        return {
+            "workers": self.workers,
+            "running": len(self._tasks),
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "queue_capacity": self.maxsize,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "last_lag_seconds": round(self.last_lag, 3),
+            "max_lag_seconds": round(self.max_lag, 3),
+            "avg_lag_seconds": (
+                round(self._total_lag / finished, 3) if finished else 0.0
+            ),
+        }
+
+
+classifier = HabitClassifier()
@@ -1,7 +1,27 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from beanie import PydanticObjectId
-from models.models import Habit, HabitTemplate
+from bson import ObjectId
+from pymongo import ASCENDING
+from beanie.operators import Set
+from pymongo.errors import DuplicateKeyError
+from models.models import Habit, HabitTemplate, IkigaiClassification
+
+# Campos que devuelve HabitOut; el resto del documento no se lee.
+HABIT_OUT_FIELDS = (
+    "owner_id",
+    "title",
+    "description",
+    "icon",
+    "color",
+    "group",
+    "type",
+    "ikigai_category",
+    "goal",
+    "task_days",
+    "reminders",
+    "created_at",
+)
 
 
 class HabitsRepository:
@@ -16,9 +36,59 @@ class HabitsRepository:
         ).to_list()
         return habits
 
+    async def list_user_habits_page(
+        self,
+        owner_id: str,
+        limit: int,
+        after: Optional[ObjectId] = None,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> List[dict]:
+        """Página de hábitos del dueño ordenados por _id, desde ``after``.
+
+        ``filters`` son igualdades sobre campos con índice (owner_id, campo,
+        _id). Solo trae los campos de salida; ``limit`` 0 no tiene tope.
+        """
+        query = {"owner_id": ObjectId(owner_id), **(filters or {})}
+        if after is not None:
+            query["_id"] = {"$gt": after}
+        cursor = (
+            Habit.get_motor_collection()
+            .find(query, {field: 1 for field in HABIT_OUT_FIELDS})
+            .sort("_id", ASCENDING)
+            .limit(limit)
+        )
+        return await cursor.to_list(None)
+
+    async def count_user_habits(
+        self, owner_id: str, filters: Optional[Dict[str, str]] = None
+    ) -> int:
+        return await Habit.get_motor_collection().count_documents(
+            {"owner_id": ObjectId(owner_id), **(filters or {})}
+        )
+
+    async def list_user_habits_for_weekday(
+        self, owner_id: str, weekday: str
+    ) -> List[Habit]:
+        return await Habit.find(
+            Habit.owner_id == PydanticObjectId(owner_id), Habit.task_days == weekday
+        ).to_list()
+
     async def get_habit(self, habit_id: str) -> Optional[Habit]:
         return await Habit.get(habit_id)
 
+    async def list_habits_by_category(
+        self, category: str, limit: Optional[int] = None
+    ) -> List[Habit]:
+        return await Habit.find(Habit.ikigai_category == category).to_list(limit)
+
+    async def set_ikigai_category(
+        self, habit_id, category: str, only_if: Optional[str] = None
+    ) -> None:
+        conditions = [Habit.id == PydanticObjectId(habit_id)]
+        if only_if is not None:
+            conditions.append(Habit.ikigai_category == only_if)
+        await Habit.find_one(*conditions).update(Set({Habit.ikigai_category: category}))
+
     async def save_habit(self, habit: Habit) -> Habit:
         await habit.save()
         return habit
@@ -45,3 +115,25 @@ class HabitsRepository:
 
     async def delete_template(self, tmpl: HabitTemplate) -> None:
         await tmpl.delete()
+
+    async def list_templates_without_category(self) -> List[HabitTemplate]:
+        return await HabitTemplate.find({"ikigai_category": None}).to_list()
+
+    async def set_template_category(self, template_id, category: str) -> None:
+        await HabitTemplate.find_one(
+            HabitTemplate.id == PydanticObjectId(template_id)
+        ).update(Set({HabitTemplate.ikigai_category: category}))
+
+    async def get_cached_category(self, key: str) -> Optional[str]:
+        cached = await IkigaiClassification.find_one(IkigaiClassification.key == key)
+        return cached.category if cached else None
+
+    async def save_cached_category(self, key: str, category: str) -> None:
+        try:
+            await IkigaiClassification.find_one(IkigaiClassification.key == key).upsert(
+                Set({IkigaiClassification.category: category}),
+                on_insert=IkigaiClassification(key=key, category=category),
+            )
+        except DuplicateKeyError:
+            # Otro worker insertó la misma clave al mismo tiempo.
+            pass
@@ -1,5 +1,13 @@
-from typing import List
+import os
+from typing import List, Optional, Tuple
+from apps.daily_completions.dailyCompletionsDBRepository import (
+    DailyCompletionsDBRepository,
+)
+from apps.habits.habitsCategoryCache import CATEGORY_KEY_FIELDS, category_cache
+from apps.habits.habitsClassifier import PENDING_CATEGORY, classifier
+from apps.habits.habitRollupDBRepository import HabitRollupDBRepository
 from apps.habits.habitsDBRepository import HabitsRepository
+from apps.habits.templateCatalogCache import TemplateCatalog, template_catalog_cache
 from models.models import Goal
 from schemas.habits import (
     HabitCreate,
@@ -7,6 +15,7 @@ from schemas.habits import (
     HabitOut,
     HabitProgress,
 )
+from schemas.jobs import JobOut
 from schemas.roles import TokenData
 from schemas.templates import (
     TemplateHabitCreate,
@@ -14,61 +23,104 @@ from schemas.templates import (
     TemplateHabitUpdate,
 )
 from fastapi import HTTPException
-
-from utils.gemini_util import get_gemini_model
+from pydantic import TypeAdapter
+from utils import revisions
+from utils.jobs import get_job, start_job
+from utils.pagination import decode_cursor, encode_cursor
+
+HABITS_PAGE_SIZE = int(os.getenv("HABITS_PAGE_SIZE", 100))
+HABITS_MAX_PAGE_SIZE = int(os.getenv("HABITS_MAX_PAGE_SIZE", 500))
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+_templates_json = TypeAdapter(List[TemplateHabitOut])
+GOAL_FIELDS = tuple(Goal.model_fields)
+
+
+def habit_row(doc: dict) -> dict:
+    """Documento crudo de ``habits`` con la forma JSON de ``HabitOut``."""
+    goal = doc["goal"]
+    return {
+        "_id": str(doc["_id"]),
+        "owner_id": str(doc["owner_id"]),
+        "title": doc["title"],
+        "description": doc.get("description"),
+        "icon": doc["icon"],
+        "color": doc["color"],
+        "group": doc.get("group"),
+        "type": doc["type"],
+        "ikigai_category": doc.get("ikigai_category"),
+        "goal": {key: goal[key] for key in GOAL_FIELDS},
+        "task_days": doc["task_days"],
+        "reminders": doc["reminders"],
+        "created_at": doc["created_at"],
+    }
 
 
 class HabitsService:
     def __init__(self):
         self.repo = HabitsRepository()
+        self.completions_repo = DailyCompletionsDBRepository()
+        self.rollup_repo = HabitRollupDBRepository()
 
     async def create_habit(self, payload: HabitCreate, owner_id: str) -> HabitOut:
         data = payload.model_dump()
-        client = get_gemini_model()
-
-        prompt = (
-            "Toma el rol de un analista que revisa y asigna una categoria de las"
-            " aristas"
-            " de el ikigai."
-            "Te entregaré la descripción de un habito a mejorar por un usuario y"
-            " lo tienes que categorizar en solo un"
-            "area del ikigai."
-            "Las categorías posibles son: "
-            "- passion "
-            "- vocation"
-            "- mission"
-            "- profession"
-            "Tienes que solo contestar con la categoría asignada,"
-            " SIN NINGUNA OTRA PALABRA."
-            "Es necesario que las palabras estén minusculas o sino me van a matar"
-            "y tal como te las escribí."
-            "El hábito a categorizar es el siguiente:"
-            f'title: {data["title"]}'
-            f'description: {data["description"]}'
-            f'group: {data["group"]}'
-            f'type {data["type"]}'
-        )
-
-        try:
-            ikigai_category = client.models.generate_content(
-                model="gemini-2.5-flash", contents=prompt
-            ).text
-        except Exception:
-            ikigai_category = "mission"
-
-        valid_categories = {"passion", "vocation", "mission", "profession"}
-
-        if ikigai_category not in valid_categories:
-            ikigai_category = "mission"
-
         data["owner_id"] = owner_id
-        data["ikigai_category"] = ikigai_category
+        category = await category_cache.get(data)
+        data["ikigai_category"] = category or PENDING_CATEGORY
         habit = await self.repo.create_habit(data)
+        await self.rollup_repo.create(habit.id, owner_id)
+        await revisions.bump(owner_id, revisions.HABITS)
+        if category is None:
+            classifier.enqueue(habit.id, data, owner_id=owner_id)
         return HabitOut.model_validate(habit)
 
-    async def list_habits(self, user: TokenData) -> List[HabitOut]:
-        habits = await self.repo.list_user_habits(user.user_id)
-        return [HabitOut.model_dump(h) for h in habits]
+    async def list_habits(
+        self,
+        user: TokenData,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        group: Optional[str] = None,
+        habit_type: Optional[str] = None,
+        ikigai_category: Optional[str] = None,
+        weekday: Optional[str] = None,
+        include_total: bool = False,
+    ) -> Tuple[List[dict], Optional[str], Optional[int]]:
+        """Devuelve una página de hábitos, el cursor de la siguiente y, si se
+        pide, el total que calza con los filtros.
+
+        Sin ``limit`` ni ``cursor`` devuelve todos los hábitos, como antes de
+        paginar; con ``cursor`` y sin ``limit`` usa ``HABITS_PAGE_SIZE``.
+        """
+        if weekday is not None and weekday not in WEEKDAYS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"El día debe ser uno de: {', '.join(WEEKDAYS)}",
+            )
+        filters = {
+            field: value
+            for field, value in (
+                ("group", group),
+                ("type", habit_type),
+                ("ikigai_category", ikigai_category),
+                ("task_days", weekday),
+            )
+            if value is not None
+        }
+        after = None
+        if cursor:
+            after = decode_cursor(cursor, 1)[0]
+            limit = limit or HABITS_PAGE_SIZE
+        docs = await self.repo.list_user_habits_page(
+            user.user_id, limit + 1 if limit else 0, after=after, filters=filters
+        )
+        next_cursor = None
+        if limit and len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor([docs[-1]["_id"]])
+        total = None
+        if include_total:
+            total = await self.repo.count_user_habits(user.user_id, filters)
+        return [habit_row(doc) for doc in docs], next_cursor, total
 
     async def update_habit(
         self, habit_id: str, payload: HabitUpdate, actor
@@ -76,37 +128,58 @@ class HabitsService:
         habit = await self.repo.get_habit(habit_id)
         if not habit:
             raise HTTPException(status_code=404, detail="Hábito no encontrado")
-        if habit.owner_id != actor.user_id and actor.role != "admin":
+        if str(habit.owner_id) != actor.user_id and actor.role != "admin":
             raise HTTPException(status_code=403, detail="Permisos insuficientes")
         changes = payload.dict(exclude_unset=True)
         for k, v in changes.items():
             setattr(habit, k, v)
         updated = await self.repo.save_habit(habit)
+        await revisions.bump(updated.owner_id, revisions.HABITS)
         return HabitOut.from_orm(updated)
 
-    async def delete_habit(self, habit_id: str) -> None:
+    async def delete_habit(self, habit_id: str, actor, background: bool = False):
         habit = await self.repo.get_habit(habit_id)
         if not habit:
             raise HTTPException(status_code=404, detail="Hábito no encontrado")
+        if str(habit.owner_id) != actor.user_id and actor.role != "admin":
+            raise HTTPException(status_code=403, detail="Permisos insuficientes")
         await self.repo.delete_habit(habit)
 
+        owner_id = str(habit.owner_id)
+        await revisions.bump(owner_id, revisions.HABITS)
+
+        async def cascade() -> dict:
+            updated = await self.completions_repo.remove_habit(owner_id, habit_id)
+            await self.rollup_repo.remove(habit_id)
+            await revisions.bump(owner_id, revisions.DAILY_COMPLETIONS)
+            return {"updated_days": updated}
+
+        if background:
+            job = await start_job("habit_delete_cascade", owner_id, cascade)
+            return JobOut.model_validate(job.model_dump(by_alias=True))
+        await cascade()
+        return None
+
+    async def get_job(self, job_id: str, actor: TokenData) -> JobOut:
+        job = await get_job(job_id)
+        if not job or (str(job.owner_id) != actor.user_id and actor.role != "admin"):
+            raise HTTPException(status_code=404, detail="Job no encontrado")
+        return JobOut.model_validate(job.model_dump(by_alias=True))
+
     async def get_progress(self, owner_id: str) -> List[HabitProgress]:
-        habits = await self.repo.list_user_habits(owner_id)
-        result = []
-        for h in habits:
-            logs = await self.repo.get_logs(owner_id, str(h.id))
-            total = len(logs)
-            done = sum(1 for log in logs if log.completed)
-            rate = (done / total * 100) if total else 0.0
-            result.append(
-                HabitProgress(
-                    habit_id=str(h.id),
-                    total_days=total,
-                    completed_days=done,
-                    completion_rate=rate,
-                )
+        rollups = await self.rollup_repo.list_for_owner(owner_id)
+        return [
+            HabitProgress(
+                habit_id=str(r.habit_id),
+                total_days=r.total_days,
+                completed_days=r.completed_days,
+                completion_rate=(
+                    r.completed_days / r.total_days * 100 if r.total_days else 0.0
+                ),
+                last_completed=r.last_completed,
             )
-        return result
+            for r in rollups
+        ]
 
     async def list_templates(self) -> List[TemplateHabitOut]:
         tmpls = await self.repo.list_templates()
@@ -114,13 +187,24 @@ class HabitsService:
             TemplateHabitOut.model_validate(t.model_dump(by_alias=True)) for t in tmpls
         ]
 
+    async def _encode_templates(self) -> bytes:
+        # Mismo JSON que generaría response_model (con alias: ``_id``).
+        return _templates_json.dump_json(await self.list_templates(), by_alias=True)
+
+    async def get_template_catalog(self) -> TemplateCatalog:
+        return await template_catalog_cache.get(self._encode_templates)
+
     async def create_template(
         self, payload: TemplateHabitCreate, actor
     ) -> TemplateHabitOut:
         if actor.role != "admin":
             raise HTTPException(status_code=403, detail="Not authorized")
         data = payload.model_dump()
+        data["ikigai_category"] = await category_cache.get(data)
         tmpl = await self.repo.create_template(data)
+        await template_catalog_cache.invalidate()
+        if tmpl.ikigai_category is None:
+            classifier.enqueue(tmpl.id, data, kind="template")
         data2 = tmpl.model_dump(by_alias=True)
         if isinstance(tmpl.goal, Goal):
             data2["goal"] = tmpl.goal.model_dump()
@@ -134,10 +218,17 @@ class HabitsService:
         tmpl = await self.repo.get_template(template_id)
         if not tmpl:
             raise HTTPException(status_code=404, detail="Template not found")
-        updated = await self.repo.update_template(
-            tmpl, changes.dict(exclude_unset=True)
-        )
-        return TemplateHabitOut.model_validate(updated)
+        data = changes.dict(exclude_unset=True)
+        reclassify = any(field in data for field in CATEGORY_KEY_FIELDS)
+        if reclassify:
+            data["ikigai_category"] = await category_cache.get(
+                {**tmpl.model_dump(), **data}
+            )
+        updated = await self.repo.update_template(tmpl, data)
+        await template_catalog_cache.invalidate()
+        if reclassify and updated.ikigai_category is None:
+            classifier.enqueue(updated.id, updated.model_dump(), kind="template")
+        return TemplateHabitOut.model_validate(updated.model_dump(by_alias=True))
 
     async def delete_template(self, template_id: str, actor) -> None:
         if actor.role != "admin":
@@ -146,3 +237,4 @@ class HabitsService:
         if not tmpl:
             raise HTTPException(status_code=404, detail="Template not found")
         await self.repo.delete_template(tmpl)
+        await template_catalog_cache.invalidate()
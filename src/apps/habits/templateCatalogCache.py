@@ -0,0 +1,69 @@
+import os
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from utils import revisions
+from utils.http_cache import etag_for
+from utils.singleflight import SingleFlight
+
+TEMPLATE_CACHE_MAX_AGE = int(os.getenv("TEMPLATE_CACHE_MAX_AGE", 60))
+
+
+class TemplateCatalog(NamedTuple):
+    body: bytes
+    etag: str
+
+
+class TemplateCatalogCache:
+    """Catálogo de templates ya serializado a JSON, por revisión.
+
+    La revisión es la global de ``revisions.TEMPLATES``, que se guarda en
+    Mongo: todo código que modifique un ``HabitTemplate`` debe llamar a
+    ``invalidate`` después de escribir y así ningún worker vuelve a servir el
+    catálogo anterior. Se reconstruye una sola vez por revisión aunque lleguen
+    muchos requests a la vez.
+    """
+
+    def __init__(self):
+        self._catalog: Optional[TemplateCatalog] = None
+        self._revision: Optional[str] = None
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, build: Callable[[], Awaitable[bytes]]) -> TemplateCatalog:
+        scope = revisions.TEMPLATES
+        revision = (await revisions.current(revisions.GLOBAL, [scope])).get(scope)
+        catalog = self._catalog
+        if catalog is not None and self._revision == revision:
+            self.hits += 1
+            return catalog
+        self.misses += 1
+        return await self._flight.do(revision, lambda: self._build(build, revision))
+
+    async def _build(
+        self, build: Callable[[], Awaitable[bytes]], revision: Optional[str]
+    ) -> TemplateCatalog:
+        body = await build()
+        catalog = TemplateCatalog(body=body, etag=etag_for(body))
+        self._catalog = catalog
+        self._revision = revision
+        return catalog
+
+    async def invalidate(self) -> None:
+        await revisions.bump(revisions.GLOBAL, revisions.TEMPLATES)
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "cached": self._catalog is not None,
+            "bytes": len(self._catalog.body) if self._catalog else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+template_catalog_cache = TemplateCatalogCache()
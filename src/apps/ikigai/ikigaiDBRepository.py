@@ -1,5 +1,6 @@
 from beanie.operators import Set
 from typing import Optional
+from bson import ObjectId
 from models.models import IkigaiEducation, User
 
 
@@ -13,11 +14,9 @@ class IkigaiDBRepository:
 
     async def get_content_by_owner(self, owner_id: str) -> Optional[IkigaiEducation]:
         user = await User.get(owner_id)
-        ikigai = user.ikigai
-        return ikigai
-
-    async def get_content_by_id(self, content_id: str) -> Optional[IkigaiEducation]:
-        return await IkigaiEducation.get(content_id)
+        if not user:
+            return None
+        return user.ikigai
 
     async def update_content(
         self, user_id: str, changes: IkigaiEducation
@@ -30,5 +29,7 @@ class IkigaiDBRepository:
         ikigai = user.ikigai
         return ikigai
 
-    async def delete_content(self, user_id) -> None:
-        await User.find_one(User.id == user_id).update(Set({User.ikigai: None}))
+    async def delete_content(self, user_id: str) -> None:
+        await User.find_one(User.id == ObjectId(user_id)).update(
+            Set({User.ikigai: None})
+        )
@@ -2,6 +2,7 @@ from fastapi import HTTPException, status
 from schemas.users import IkigaiEducation, IkigaiEducationCreate, IkigaiEducationUpdate
 from schemas.roles import TokenData
 from apps.ikigai.ikigaiDBRepository import IkigaiDBRepository
+from utils import revisions
 
 
 class IkigaiService:
@@ -13,6 +14,7 @@ class IkigaiService:
     ) -> IkigaiEducation:
         data = payload.model_dump()
         content = await self.repo.create_content(user.user_id, data)
+        await revisions.bump(user.user_id, revisions.PROFILE)
         return IkigaiEducation.model_validate(content)
 
     async def get_content(self, user: TokenData) -> IkigaiEducation:
@@ -35,12 +37,14 @@ class IkigaiService:
         [setattr(content, k, v) for k, v in changes.items() if hasattr(content, k)]
 
         updated = await self.repo.update_content(user.user_id, content)
+        await revisions.bump(user.user_id, revisions.PROFILE)
         return IkigaiEducation.model_validate(updated)
 
-    async def delete_content(self, content_id: str) -> None:
-        content = await self.repo.get_content_by_id(content_id)
+    async def delete_content(self, owner_id: str) -> None:
+        content = await self.repo.get_content_by_owner(owner_id)
         if not content:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Contenido no encontrado"
             )
-        await self.repo.delete_content(content)
+        await self.repo.delete_content(owner_id)
+        await revisions.bump(owner_id, revisions.PROFILE)
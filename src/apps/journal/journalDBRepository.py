@@ -1,26 +1,89 @@
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional, Set, Tuple
 
 from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import DuplicateKeyError
 
-from models.models import Journal, JournalEntry, JournalQuestion
+from models.models import Journal, JournalEntryRecord, JournalQuestion
+from utils import revisions
 
 
 class JournalDBRepository:
-    async def create_journal_question(self, question: str) -> JournalQuestion:
-        today = datetime.combine(datetime.today().date(), datetime.min.time())
-        journal_question_data = {
-            "date": today,
-            "question": question,
-        }
-
-        question = JournalQuestion(**journal_question_data)
-        await question.insert()
-        return question
+    async def get_journal_question(self, day: datetime) -> Optional[JournalQuestion]:
+        return await JournalQuestion.find_one(JournalQuestion.date == day)
 
     async def get_today_journal_question(self) -> Optional[JournalQuestion]:
         today = datetime.combine(datetime.today().date(), datetime.min.time())
-        return await JournalQuestion.find(JournalQuestion.date == today).first_or_none()
+        return await self.get_journal_question(today)
+
+    async def claim_journal_question(
+        self, day: datetime, stale_before: datetime
+    ) -> bool:
+        """Reclama la generación de la pregunta del día.
+
+        Devuelve True solo para el llamador que debe generarla: el que inserta
+        el documento o el que toma un reclamo abandonado.
+        """
+        collection = JournalQuestion.get_motor_collection()
+        try:
+            result = await collection.update_one(
+                {
+                    "date": day,
+                    "question": None,
+                    "$or": [
+                        {"claimed_at": None},
+                        {"claimed_at": {"$lt": stale_before}},
+                    ],
+                },
+                {"$set": {"claimed_at": datetime.utcnow()}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False
+        return result.upserted_id is not None or result.modified_count == 1
+
+    async def set_journal_question(
+        self, day: datetime, question: str, upsert: bool = False
+    ) -> bool:
+        try:
+            result = await JournalQuestion.get_motor_collection().update_one(
+                {"date": day, "question": None},
+                {"$set": {"question": question}, "$unset": {"claimed_at": ""}},
+                upsert=upsert,
+            )
+        except DuplicateKeyError:
+            return False
+        return result.modified_count == 1 or result.upserted_id is not None
+
+    async def list_ready_question_days(self, days: List[datetime]) -> Set[date]:
+        questions = await JournalQuestion.find(
+            {"date": {"$in": days}, "question": {"$ne": None}}
+        ).to_list()
+        return {q.date for q in questions}
+
+    async def release_journal_question_claim(self, day: datetime) -> None:
+        await JournalQuestion.get_motor_collection().update_one(
+            {"date": day, "question": None}, {"$unset": {"claimed_at": ""}}
+        )
+
+    async def remove_duplicate_questions(self) -> int:
+        """Deja un documento por fecha en ``journal_question``: el que ya tiene
+        pregunta y, entre esos, el más antiguo."""
+        collection = JournalQuestion.get_motor_collection()
+        duplicates = collection.aggregate(
+            [
+                {"$sort": {"question": -1, "_id": 1}},
+                {"$group": {"_id": "$date", "ids": {"$push": "$_id"}}},
+                {"$match": {"ids.1": {"$exists": True}}},
+            ],
+            allowDiskUse=True,
+        )
+        removed = 0
+        async for group in duplicates:
+            result = await collection.delete_many({"_id": {"$in": group["ids"][1:]}})
+            removed += result.deleted_count
+        return removed
 
     async def create_journal(self, user_id: str) -> Journal:
         journal_data = {
@@ -39,30 +102,113 @@ class JournalDBRepository:
         journal = await Journal.get(id)
         return journal
 
-    async def add_entry_to_journal(
-        self, journal_id: str, entry_data: dict
-    ) -> JournalEntry:
-        today = datetime.combine(datetime.today().date(), datetime.min.time())
-        entry_data["date"] = today
-        entry = JournalEntry(**entry_data)
-
-        journal = await self.get_journal(journal_id)
-        journal.entries.append(entry)
-        await journal.save()
-
-        return entry
+    async def add_entry(self, user_id: str, text: str) -> JournalEntryRecord:
+        record = JournalEntryRecord(
+            user_id=ObjectId(user_id), date=datetime.today().date(), entry=text
+        )
+        await record.insert()
+        return record
 
     async def get_entry_by_date(
         self, user_id: str, date: datetime
-    ) -> Optional[JournalEntry]:
-        journal = await self.get_journal_by_user_id(user_id)
-        if not journal:
-            return None
-
-        target = date.date()
-
-        for entry in journal.entries:
-            if entry.date == target:
-                return entry
-
-        return None
+    ) -> Optional[JournalEntryRecord]:
+        return (
+            await JournalEntryRecord.find(
+                JournalEntryRecord.user_id == ObjectId(user_id),
+                JournalEntryRecord.date == date.date(),
+            )
+            .sort(+JournalEntryRecord.id)
+            .first_or_none()
+        )
+
+    async def list_entries(
+        self,
+        user_id: str,
+        limit: int,
+        after: Optional[Tuple[datetime, ObjectId]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> List[dict]:
+        """Página de entradas ordenadas por (date, _id), desde ``after``.
+
+        ``start`` y ``end`` son inclusivos. Solo trae los campos de salida.
+        """
+        query = {"user_id": ObjectId(user_id)}
+        window = {}
+        if start is not None:
+            window["$gte"] = datetime.combine(start, datetime.min.time())
+        if end is not None:
+            window["$lte"] = datetime.combine(end, datetime.min.time())
+        if window:
+            query["date"] = window
+        if after is not None:
+            after_date, after_id = after
+            query["$or"] = [
+                {"date": {"$gt": after_date}},
+                {"date": after_date, "_id": {"$gt": after_id}},
+            ]
+        cursor = (
+            JournalEntryRecord.get_motor_collection()
+            .find(query, {"date": 1, "entry": 1})
+            .sort([("date", ASCENDING), ("_id", ASCENDING)])
+            .limit(limit)
+        )
+        return await cursor.to_list(None)
+
+    async def search_entries(
+        self, user_id: str, text: str, limit: int, offset: int = 0
+    ) -> List[dict]:
+        """Entradas que calzan con ``text`` según el índice de texto en español,
+        de mayor a menor relevancia."""
+        score = {"$meta": "textScore"}
+        cursor = (
+            JournalEntryRecord.get_motor_collection()
+            .find(
+                {
+                    "user_id": ObjectId(user_id),
+                    "$text": {"$search": text, "$language": "spanish"},
+                },
+                {"date": 1, "entry": 1, "score": score},
+            )
+            .sort([("score", score), ("date", DESCENDING)])
+            .skip(offset)
+            .limit(limit)
+        )
+        return await cursor.to_list(None)
+
+    async def migrate_embedded_entries(self) -> int:
+        """Mueve ``Journal.entries`` a la colección ``journal_entries``.
+
+        Se puede correr más de una vez: cada entrada se inserta con un upsert
+        por (usuario, fecha, texto) y el arreglo solo se vacía si no cambió
+        mientras se copiaba.
+        """
+        journals = Journal.get_motor_collection().find(
+            {"entries.0": {"$exists": True}}, {"user_id": 1, "entries": 1}
+        )
+        moved = 0
+        async for journal in journals:
+            entries = journal["entries"]
+            await JournalEntryRecord.get_motor_collection().bulk_write(
+                [
+                    UpdateOne(
+                        {
+                            "user_id": journal["user_id"],
+                            "date": entry["date"],
+                            "entry": entry["entry"],
+                        },
+                        {"$setOnInsert": {"created_at": entry["date"]}},
+                        upsert=True,
+                    )
+                    for entry in entries
+                ],
+                ordered=False,
+            )
+            result = await Journal.get_motor_collection().update_one(
+                {"_id": journal["_id"], "entries": {"$size": len(entries)}},
+                {"$set": {"entries": []}},
+            )
+            if result.modified_count:
+                moved += len(entries)
+                await revisions.bump(journal["user_id"], revisions.JOURNAL)
+        return moved
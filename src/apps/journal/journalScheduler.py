@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Optional
+
+from apps.journal.journalService import JournalService
+from utils.leader import LeaderLease
+
+logger = logging.getLogger(__name__)
+
+QUESTION_DAYS_AHEAD = int(os.getenv("QUESTION_DAYS_AHEAD", 7))
+QUESTION_SCHEDULER_INTERVAL_SECONDS = int(
+    os.getenv("QUESTION_SCHEDULER_INTERVAL_SECONDS", 15 * 60)
+)
+QUESTION_SCHEDULER_RETRY_SECONDS = int(
+    os.getenv("QUESTION_SCHEDULER_RETRY_SECONDS", 60)
+)
+
+
+class JournalQuestionScheduler:
+    """Mantiene pregeneradas las preguntas de los próximos días.
+
+    Corre en todos los workers, pero solo el que tiene el lease genera.
+    """
+
+    def __init__(
+        self,
+        days_ahead: int = QUESTION_DAYS_AHEAD,
+        interval: int = QUESTION_SCHEDULER_INTERVAL_SECONDS,
+        retry: int = QUESTION_SCHEDULER_RETRY_SECONDS,
+    ):
+        self.service = JournalService()
+        self.days_ahead = days_ahead
+        self.interval = interval
+        self.retry = retry
+        self.lease = LeaderLease("journal-questions", ttl_seconds=interval * 2)
+        self._task: Optional[asyncio.Task] = None
+
+        self.last_run: Optional[datetime] = None
+        self.missing_days = 0
+        self.last_error: Optional[str] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await self.lease.release()
+
+    async def run_once(self) -> bool:
+        """Devuelve True si quedaron días sin pregunta."""
+        if not await self.lease.acquire():
+            return False
+        self.last_run = datetime.utcnow()
+        try:
+            self.missing_days = await self.service.pregenerate_questions(
+                self.days_ahead
+            )
+        except Exception as exc:
+            self.last_error = str(exc)
+            logger.exception("Journal question pre-generation failed")
+            return True
+        self.last_error = None
+        return self.missing_days > 0
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                has_gaps = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.last_error = str(exc)
+                logger.exception("Journal question scheduler error")
+                has_gaps = True
+            await asyncio.sleep(self.retry if has_gaps else self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "is_leader": self.lease.is_leader,
+            "days_ahead": self.days_ahead,
+            "last_run": self.last_run,
+            "missing_days": self.missing_days,
+            "last_error": self.last_error,
+        }
+
+
+question_scheduler = JournalQuestionScheduler()
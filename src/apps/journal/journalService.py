@@ -1,15 +1,86 @@
-from datetime import datetime
-from typing import List, Optional
+import asyncio
+import os
+import re
+import unicodedata
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
 from apps.journal.journalDBRepository import JournalDBRepository
-from models.models import Journal, JournalQuestion
-from schemas.journal import JournalEntryCreate, JournalEntryOut, JournalQuestionOut
+from models.models import Journal
+from schemas.journal import (
+    JournalEntryCreate,
+    JournalEntryOut,
+    JournalQuestionOut,
+    JournalSearchHit,
+)
 from schemas.roles import TokenData
+from utils import revisions
 from utils.gemini_util import get_gemini_model
+from utils.pagination import decode_cursor, encode_cursor
+from utils.singleflight import SingleFlight
+
+JOURNAL_PAGE_SIZE = int(os.getenv("JOURNAL_PAGE_SIZE", 50))
+JOURNAL_MAX_PAGE_SIZE = int(os.getenv("JOURNAL_MAX_PAGE_SIZE", 200))
+SNIPPET_LENGTH = 160
+QUESTION_CLAIM_TIMEOUT_SECONDS = int(os.getenv("QUESTION_CLAIM_TIMEOUT_SECONDS", 30))
+QUESTION_POLL_SECONDS = float(os.getenv("QUESTION_POLL_SECONDS", 0.5))
+
+QUESTION_PROMPT = (
+    "En el contexto de una aplicacion de habitos "
+    "y desarrollo personal,"
+    "tu tarea es generar una pregunta la cual sera "
+    "considerada como la pregunta del dia."
+    "Esta pregunta debe ser desde la perspectiva de"
+    " la filosofia Kaizen (buscar algo que amas,"
+    "que el mundo necesita, en lo que eres bueno y"
+    " para lo que te puedan pagar). Considera que"
+    "esta es una pregunta que deberan responder los"
+    " usuarios para una seccion de journaling, asi que"
+    "considera que sirva como introspeccion para que"
+    " puedan conocerse mas y mejorar."
+    "La frase debe ser simple, no muy larga, entendible,"
+    " profunda y en español."
+)
+
+_QUESTION_PREFIX = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s*")
+
+
+def _parse_questions(text: str) -> List[str]:
+    questions: List[str] = []
+    for line in text.splitlines():
+        question = _QUESTION_PREFIX.sub("", line).strip()
+        if question and question not in questions:
+            questions.append(question)
+    return questions
+
+
+def _fold(text: str) -> str:
+    # Minúsculas y sin tildes, carácter por carácter para conservar posiciones.
+    return "".join(
+        unicodedata.normalize("NFKD", c)[0].lower() if c.strip() else " " for c in text
+    )
+
+
+def make_snippet(text: str, query: str, length: int = SNIPPET_LENGTH) -> str:
+    """Fragmento de ``text`` alrededor del primer término buscado."""
+    if len(text) <= length:
+        return text
+    folded = _fold(text)
+    # El índice usa raíces, así que basta con el comienzo de cada palabra.
+    terms = [t[:5] for t in _fold(query).split() if len(t) >= 3]
+    hits = [pos for pos in (folded.find(t) for t in terms) if pos >= 0]
+    start = max(0, min(hits) - length // 3) if hits else 0
+    start = min(start, len(text) - length)
+    snippet = text[start : start + length].strip()
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + length < len(text) else ""
+    return f"{prefix}{snippet}{suffix}"
 
 
 class JournalService:
     def __init__(self):
         self.repo = JournalDBRepository()
+        self._daily_question: Optional[Tuple[date, JournalQuestionOut]] = None
+        self._question_flight = SingleFlight()
 
     async def create_journal(self, user: TokenData) -> Journal:
         user_id = user.user_id
@@ -29,62 +100,134 @@ class JournalService:
     async def create_journal_entry(
         self, payload: JournalEntryCreate, user: TokenData
     ) -> JournalEntryOut:
-        journal = await self.get_or_create_journal(user)
-
-        entry_data = payload.model_dump()
-        entry = await self.repo.add_entry_to_journal(journal.id, entry_data)
-
-        return JournalEntryOut.model_validate(entry.model_dump())
-
-    async def get_journal_entries(self, user: TokenData) -> List[JournalEntryOut]:
-        journal = await self.get_journal(user)
-        if not journal:
-            return []
-
-        return [JournalEntryOut.model_validate(h.model_dump()) for h in journal.entries]
+        record = await self.repo.add_entry(user.user_id, payload.entry)
+        await revisions.bump(user.user_id, revisions.JOURNAL)
+        return JournalEntryOut.model_validate(record, from_attributes=True)
+
+    async def get_journal_entries(
+        self,
+        user: TokenData,
+        limit: int = JOURNAL_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Tuple[List[JournalEntryOut], Optional[str]]:
+        """Devuelve una página de entradas y el cursor de la siguiente."""
+        after = tuple(decode_cursor(cursor, 2)) if cursor else None
+        docs = await self.repo.list_entries(
+            user.user_id, limit + 1, after=after, start=start, end=end
+        )
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor([docs[-1]["date"], docs[-1]["_id"]])
+        entries = [JournalEntryOut(date=d["date"], entry=d["entry"]) for d in docs]
+        return entries, next_cursor
+
+    async def search_journal_entries(
+        self,
+        user: TokenData,
+        query: str,
+        limit: int = JOURNAL_PAGE_SIZE,
+        offset: int = 0,
+    ) -> List[JournalSearchHit]:
+        docs = await self.repo.search_entries(user.user_id, query, limit, offset)
+        return [
+            JournalSearchHit(
+                date=d["date"],
+                snippet=make_snippet(d["entry"], query),
+                score=d["score"],
+            )
+            for d in docs
+        ]
 
     async def get_journal_entry_by_date(
         self, user: TokenData, date: datetime
     ) -> Optional[JournalEntryOut]:
-        entry = await self.repo.get_entry_by_date(user.user_id, date)
-        if not entry:
+        record = await self.repo.get_entry_by_date(user.user_id, date)
+        if not record:
             return None
 
-        return JournalEntryOut.model_validate(entry.model_dump())
+        return JournalEntryOut.model_validate(record, from_attributes=True)
 
-    async def create_daily_question(self) -> JournalQuestion:
+    async def generate_daily_questions(self, count: int = 1) -> List[str]:
         client = get_gemini_model()
 
-        prompt = (
-            "En el contexto de una aplicacion de habitos "
-            "y desarrollo personal,"
-            "tu tarea es generar una pregunta la cual sera "
-            "considerada como la pregunta del dia."
-            "Esta pregunta debe ser desde la perspectiva de"
-            " la filosofia Kaizen (buscar algo que amas,"
-            "que el mundo necesita, en lo que eres bueno y"
-            " para lo que te puedan pagar). Considera que"
-            "esta es una pregunta que deberan responder los"
-            " usuarios para una seccion de journaling, asi que"
-            "considera que sirva como introspeccion para que"
-            " puedan conocerse mas y mejorar."
-            "La frase debe ser simple, no muy larga, entendible,"
-            " profunda y en español."
-            "Responde UNICAMENTE con la pregunta, sin mas texto"
-            " adicional"
+        if count == 1:
+            instructions = (
+                "Responde UNICAMENTE con la pregunta, sin mas texto adicional"
+            )
+        else:
+            instructions = (
+                f"Genera {count} preguntas distintas entre si. Responde "
+                "UNICAMENTE con las preguntas, una por linea, sin numeracion"
+                " ni texto adicional"
+            )
+
+        response = await client.aio.models.generate_content(
+            model="gemini-2.5-flash", contents=QUESTION_PROMPT + instructions
         )
-
-        question_data = client.models.generate_content(
-            model="gemini-2.5-flash", contents=prompt
-        ).text
-
-        question = await self.repo.create_journal_question(question_data)
-
+        return _parse_questions(response.text or "")[:count]
+
+    async def pregenerate_questions(self, days_ahead: int) -> int:
+        """Genera las preguntas que faltan y devuelve cuántos días siguen sin una."""
+        today = date.today()
+        days = [
+            datetime.combine(today + timedelta(days=i), datetime.min.time())
+            for i in range(days_ahead)
+        ]
+        ready = await self.repo.list_ready_question_days(days)
+        missing = [day for day in days if day.date() not in ready]
+        if not missing:
+            return 0
+
+        # Si Gemini devuelve menos preguntas, los días restantes quedan
+        # pendientes y se completan en la siguiente pasada.
+        questions = await self.generate_daily_questions(len(missing))
+        for day, question in zip(missing, questions):
+            await self.repo.set_journal_question(day, question, upsert=True)
+
+        ready = await self.repo.list_ready_question_days(missing)
+        return len(missing) - len(ready)
+
+    async def _fetch_or_generate_question(self, day: datetime) -> str:
+        while True:
+            question = await self.repo.get_journal_question(day)
+            if question and question.question:
+                return question.question
+
+            stale_before = datetime.utcnow() - timedelta(
+                seconds=QUESTION_CLAIM_TIMEOUT_SECONDS
+            )
+            if await self.repo.claim_journal_question(day, stale_before):
+                try:
+                    questions = await self.generate_daily_questions()
+                except Exception:
+                    await self.repo.release_journal_question_claim(day)
+                    raise
+                if not questions:
+                    await self.repo.release_journal_question_claim(day)
+                    raise RuntimeError("Gemini no devolvió una pregunta")
+                if await self.repo.set_journal_question(day, questions[0]):
+                    return questions[0]
+                # El scheduler la publicó primero; se lee la suya.
+                continue
+
+            # Otro worker la está generando; se espera a que la publique.
+            await asyncio.sleep(QUESTION_POLL_SECONDS)
+
+    async def _load_daily_question(self, today: date) -> JournalQuestionOut:
+        day = datetime.combine(today, datetime.min.time())
+        text = await self._fetch_or_generate_question(day)
+        question = JournalQuestionOut(question=text)
+        self._daily_question = (today, question)
         return question
 
     async def get_or_create_daily_question(self) -> JournalQuestionOut:
-        question = await self.repo.get_today_journal_question()
-        if not question:
-            question = await self.create_daily_question()
+        today = date.today()
+        if self._daily_question and self._daily_question[0] == today:
+            return self._daily_question[1]
 
-        return JournalQuestionOut.model_validate(question.model_dump())
+        return await self._question_flight.do(
+            today, lambda: self._load_daily_question(today)
+        )
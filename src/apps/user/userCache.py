@@ -0,0 +1,34 @@
+import os
+from typing import Optional
+
+from schemas.roles import UserOut
+from utils.cache import StatsCache
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", 60))
+
+
+class UserProfileCache:
+    """Perfiles (``UserOut``) por (usuario, revisión).
+
+    La revisión es la de ``revisions.PROFILE`` del usuario, que se guarda en
+    Mongo: todo código que modifique un ``User`` debe hacer ``revisions.bump``
+    y así ningún worker vuelve a servir el perfil anterior.
+    """
+
+    def __init__(
+        self, maxsize: int = USER_CACHE_SIZE, ttl: int = USER_CACHE_TTL_SECONDS
+    ):
+        self.memory = StatsCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, user_id: str, revision: Optional[str]) -> Optional[UserOut]:
+        return self.memory.get((user_id, revision))
+
+    def set(self, user_id: str, revision: Optional[str], profile: UserOut) -> None:
+        self.memory.set((user_id, revision), profile)
+
+    def stats(self) -> dict:
+        return self.memory.stats()
+
+
+user_cache = UserProfileCache()
@@ -1,7 +1,39 @@
+from datetime import date, datetime, timedelta
 from typing import Optional
+
+from bson import ObjectId
+
 from models.models import User
 
 
 class UserDBRepository:
     async def get_by_id(self, user_id: str) -> Optional[User]:
         return await User.get(user_id)
+
+    async def update_streak(self, user_id: str, today: date) -> bool:
+        """Suma un día a la racha si el último fue ayer, la reinicia si fue antes.
+
+        Es una sola actualización condicional sobre ``streak`` y
+        ``last_timestamp``; si la racha ya se contó hoy no modifica nada y
+        devuelve False.
+        """
+        today_dt = datetime.combine(today, datetime.min.time())
+        yesterday_dt = today_dt - timedelta(days=1)
+        result = await User.get_motor_collection().update_one(
+            {"_id": ObjectId(user_id), "last_timestamp": {"$ne": today_dt}},
+            [
+                {
+                    "$set": {
+                        "streak": {
+                            "$cond": [
+                                {"$eq": ["$last_timestamp", yesterday_dt]},
+                                {"$add": [{"$ifNull": ["$streak", 0]}, 1]},
+                                1,
+                            ]
+                        },
+                        "last_timestamp": today_dt,
+                    }
+                }
+            ],
+        )
+        return result.modified_count == 1
@@ -1,6 +1,8 @@
 from fastapi import HTTPException, status
 from schemas.roles import TokenData, UserOut
+from apps.user.userCache import user_cache
 from apps.user.userDBRepository import UserDBRepository
+from utils import revisions
 
 
 class UserService:
@@ -8,9 +10,16 @@ class UserService:
         self.repo = UserDBRepository()
 
     async def get_user_info(self, user: TokenData) -> UserOut:
+        scope = revisions.PROFILE
+        revision = (await revisions.current(user.user_id, [scope])).get(scope)
+        profile = user_cache.get(user.user_id, revision)
+        if profile is not None:
+            return profile
         db_user = await self.repo.get_by_id(user.user_id)
         if not db_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
             )
-        return UserOut.from_orm(db_user)
+        profile = UserOut.from_orm(db_user)
+        user_cache.set(user.user_id, revision, profile)
+        return profile
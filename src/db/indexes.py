@@ -0,0 +1,131 @@
+import logging
+from typing import Dict, List, Sequence, Type
+
+from beanie import Document
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Opciones que cambian el comportamiento del índice; el resto (v, ns, ...) se
+# ignora al comparar con lo que existe en Mongo.
+INDEX_OPTIONS = (
+    "unique",
+    "sparse",
+    "partialFilterExpression",
+    "expireAfterSeconds",
+    "default_language",
+)
+
+
+def declared_indexes(model: Type[Document]) -> List[IndexModel]:
+    settings = getattr(model, "Settings", None)
+    return list(getattr(settings, "indexes", None) or [])
+
+
+def _key(index: dict) -> list:
+    # Mongo reporta los índices de texto como (_fts, _ftsx) más los pesos;
+    # se vuelven a escribir como fueron declarados: (campo, "text").
+    key = []
+    for field, direction in index["key"]:
+        if field == "_fts":
+            key += [(name, "text") for name in sorted(index.get("weights", {}))]
+        elif field != "_ftsx":
+            key.append((field, direction))
+    return key
+
+
+def _spec(index: dict) -> dict:
+    spec = {"key": _key(index)}
+    spec.update({opt: index[opt] for opt in INDEX_OPTIONS if opt in index})
+    return spec
+
+
+def _declared_specs(model: Type[Document]) -> Dict[str, dict]:
+    specs = {}
+    for index in declared_indexes(model):
+        document = dict(index.document)
+        document["key"] = list(document["key"].items())
+        specs[document["name"]] = _spec(document)
+    return specs
+
+
+async def index_drift(model: Type[Document]) -> dict:
+    """Compara los índices declarados en el modelo con los que hay en Mongo."""
+    collection = model.get_motor_collection()
+    existing = {
+        name: _spec(info)
+        for name, info in (await collection.index_information()).items()
+        if name != "_id_"
+    }
+    declared = _declared_specs(model)
+
+    return {
+        "collection": collection.name,
+        "missing": sorted(name for name in declared if name not in existing),
+        "changed": sorted(
+            name
+            for name, spec in declared.items()
+            if name in existing and existing[name] != spec
+        ),
+        "extra": sorted(name for name in existing if name not in declared),
+    }
+
+
+async def drift_report(models: Sequence[Type[Document]]) -> List[dict]:
+    report = []
+    for model in models:
+        drift = await index_drift(model)
+        if drift["missing"] or drift["changed"] or drift["extra"]:
+            report.append(drift)
+    return report
+
+
+async def ensure_indexes(
+    models: Sequence[Type[Document]], prune: bool = False, rebuild: bool = False
+) -> List[dict]:
+    """Crea los índices declarados que faltan y devuelve el drift restante.
+
+    Los índices con opciones distintas a las declaradas solo se tocan con
+    ``rebuild``, que los borra y los vuelve a crear. Con ``prune`` se eliminan
+    los que ya no están declarados. Si un índice no se puede construir (por
+    ejemplo, un único con duplicados) el error queda en el reporte y se sigue
+    con el resto.
+    """
+    errors = {}
+    for model in models:
+        collection = model.get_motor_collection()
+        drift = await index_drift(model)
+        to_build = drift["missing"] + (drift["changed"] if rebuild else [])
+        missing = [
+            index
+            for index in declared_indexes(model)
+            if index.document["name"] in to_build
+        ]
+        try:
+            if rebuild:
+                for name in drift["changed"]:
+                    await collection.drop_index(name)
+            if missing:
+                await collection.create_indexes(missing)
+            if prune:
+                for name in drift["extra"]:
+                    await collection.drop_index(name)
+        except OperationFailure as exc:
+            errors[collection.name] = str(exc)
+
+    report = await drift_report(models)
+    for entry in report:
+        if entry["collection"] in errors:
+            entry["error"] = errors[entry["collection"]]
+    return report
+
+
+async def build_indexes_in_background(models: Sequence[Type[Document]]) -> None:
+    try:
+        drift = await ensure_indexes(models)
+    except Exception:
+        logger.exception("Index build failed")
+        return
+    for entry in drift:
+        logger.warning("Index drift: %s", entry)
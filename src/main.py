@@ -1,3 +1,5 @@
+import asyncio
+import logging
 import traceback
 from typing import Union
 from fastapi import FastAPI, Request
@@ -8,16 +10,20 @@ from dotenv import load_dotenv
 
 from fastapi.middleware.cors import CORSMiddleware
 
+from db.indexes import build_indexes_in_background
 from db.mongodb import db
-
-from models.models import (
-    Journal,
-    JournalQuestion,
-    User,
-    Habit,
-    HabitTemplate,
-    DailyCompletions,
+from apps.auth.tokenRevocation import revocation_list
+from apps.habits.habitsClassifier import classifier
+from apps.journal.journalScheduler import question_scheduler
+from utils.auth_utils import (
+    BCRYPT_CALIBRATE,
+    calibrate_bcrypt_rounds,
+    set_bcrypt_rounds,
 )
+from utils.jobs import fail_stale_jobs
+from utils.password_pool import password_hasher
+
+from models.models import DOCUMENT_MODELS
 
 from routers.auth import router as auth_router
 from routers.habits import router as habits_router
@@ -28,6 +34,8 @@ from routers.daily_completions import router as daily_completion_router
 from routers.journal import router as journal_router
 
 load_dotenv()
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 app = FastAPI()
 
 app.add_middleware(
@@ -36,6 +44,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag"],
 )
 
 
@@ -60,17 +69,29 @@ def read_item(item_id: int, q: Union[str, None] = None):
 
 @app.on_event("startup")
 async def on_startup():
-    await init_beanie(
-        database=db,
-        document_models=[
-            User,
-            Habit,
-            HabitTemplate,
-            DailyCompletions,
-            Journal,
-            JournalQuestion,
-        ],
+    await init_beanie(database=db, document_models=DOCUMENT_MODELS, skip_indexes=True)
+    stale_jobs = await fail_stale_jobs()
+    if stale_jobs:
+        logger.warning("Marked %d interrupted background jobs as failed", stale_jobs)
+    app.state.index_build = asyncio.create_task(
+        build_indexes_in_background(DOCUMENT_MODELS)
     )
+    await classifier.start()
+    await classifier.requeue_pending()
+    await question_scheduler.start()
+    await revocation_list.start()
+    if BCRYPT_CALIBRATE:
+        rounds, elapsed = await asyncio.to_thread(calibrate_bcrypt_rounds)
+        set_bcrypt_rounds(rounds)
+        logger.info("bcrypt calibrated: %d rounds (%.0f ms per hash)", rounds, elapsed)
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await classifier.stop()
+    await question_scheduler.stop()
+    await revocation_list.stop()
+    password_hasher.stop()
 
 
 app.include_router(auth_router)
@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import sys
+
+from beanie import init_beanie
+
+from apps.daily_completions.dailyCompletionsDBRepository import (
+    DailyCompletionsDBRepository,
+)
+from apps.habits.habitRollupDBRepository import HabitRollupDBRepository
+from apps.journal.journalDBRepository import JournalDBRepository
+from db.indexes import drift_report, ensure_indexes
+from db.mongodb import db
+from models.models import DOCUMENT_MODELS
+from utils.auth_utils import BCRYPT_TARGET_MS, calibrate_bcrypt_rounds
+
+
+async def indexes(args) -> int:
+    if args.apply:
+        report = await ensure_indexes(
+            DOCUMENT_MODELS, prune=args.prune, rebuild=args.rebuild
+        )
+    else:
+        report = await drift_report(DOCUMENT_MODELS)
+
+    for entry in report:
+        print(
+            f"{entry['collection']}: missing={entry['missing']} "
+            f"changed={entry['changed']} extra={entry['extra']}"
+            + (f" error={entry['error']}" if "error" in entry else "")
+        )
+    if not report:
+        print("Indexes in sync")
+    return 1 if report else 0
+
+
+async def completions(args) -> int:
+    if args.dedupe:
+        removed = await DailyCompletionsDBRepository().remove_duplicate_days()
+        print(f"Removed {removed} duplicate daily completions")
+    return 0
+
+
+async def rollups(args) -> int:
+    if args.rebuild:
+        count = await HabitRollupDBRepository().rebuild()
+        print(f"Rebuilt progress rollups for {count} habits")
+    return 0
+
+
+async def journal(args) -> int:
+    if args.migrate:
+        moved = await JournalDBRepository().migrate_embedded_entries()
+        print(f"Moved {moved} journal entries to journal_entries")
+    if args.dedupe_questions:
+        removed = await JournalDBRepository().remove_duplicate_questions()
+        print(f"Removed {removed} duplicate journal questions")
+    return 0
+
+
+async def bcrypt(args) -> int:
+    rounds, elapsed = await asyncio.to_thread(calibrate_bcrypt_rounds, args.target_ms)
+    print(f"BCRYPT_ROUNDS={rounds}  # {elapsed:.0f} ms per hash on this machine")
+    return 0
+
+
+async def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Kaizen maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    index_cmd = commands.add_parser(
+        "indexes", help="Report index drift, or build missing indexes with --apply"
+    )
+    index_cmd.add_argument("--apply", action="store_true")
+    index_cmd.add_argument(
+        "--prune", action="store_true", help="With --apply, drop undeclared indexes"
+    )
+    index_cmd.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="With --apply, drop and recreate indexes whose options changed",
+    )
+    index_cmd.set_defaults(handler=indexes)
+
+    completions_cmd = commands.add_parser(
+        "completions", help="Daily completions maintenance"
+    )
+    completions_cmd.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Keep one document per (user_id, date) before the unique index build",
+    )
+    completions_cmd.set_defaults(handler=completions)
+
+    rollups_cmd = commands.add_parser("rollups", help="Per-habit progress rollups")
+    rollups_cmd.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Recompute every rollup from daily_completions",
+    )
+    rollups_cmd.set_defaults(handler=rollups)
+
+    journal_cmd = commands.add_parser("journal", help="Journal maintenance")
+    journal_cmd.add_argument(
+        "--migrate",
+        action="store_true",
+        help="Move embedded Journal.entries into the journal_entries collection",
+    )
+    journal_cmd.add_argument(
+        "--dedupe-questions",
+        action="store_true",
+        help="Keep one journal_question per date before the unique index build",
+    )
+    journal_cmd.set_defaults(handler=journal)
+
+    bcrypt_cmd = commands.add_parser(
+        "bcrypt", help="Measure bcrypt and recommend BCRYPT_ROUNDS"
+    )
+    bcrypt_cmd.add_argument(
+        "--target-ms",
+        type=float,
+        default=BCRYPT_TARGET_MS,
+        help="Maximum time per hash, in milliseconds",
+    )
+    bcrypt_cmd.set_defaults(handler=bcrypt, needs_db=False)
+
+    args = parser.parse_args(argv)
+    if getattr(args, "needs_db", True):
+        await init_beanie(
+            database=db, document_models=DOCUMENT_MODELS, skip_indexes=True
+        )
+    return await args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
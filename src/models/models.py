@@ -1,6 +1,7 @@
 from typing import Optional, List
 from datetime import datetime, date
 from beanie import Document
+from pymongo import ASCENDING, TEXT, IndexModel
 from pydantic import EmailStr, Field, BaseModel, field_validator, ConfigDict
 from enum import Enum
 from bson import ObjectId
@@ -45,23 +46,9 @@ class User(Document):
     ikigai: Optional[IkigaiEducation] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
-    def update_streak(self):
-        today = date.today()
-        if self.last_timestamp is None:
-            self.streak = 1
-        else:
-            days_diff = (today - self.last_timestamp).days
-            if days_diff == 0:
-                return False
-            elif days_diff == 1:
-                self.streak += 1
-            else:
-                self.streak = 1
-        self.last_timestamp = today
-        return True
-
     class Settings:
         name = "users"
+        indexes = [IndexModel([("email", ASCENDING)], unique=True)]
 
     @field_validator("ikigai", mode="before")
     def _convert_goal(cls, v):
@@ -124,6 +111,37 @@ class Habit(Document):
 
     class Settings:
         name = "habits"
+        # Listados paginados por _id dentro del dueño, con un índice por filtro.
+        indexes = [
+            IndexModel(
+                [("owner_id", ASCENDING), ("_id", ASCENDING)], name="owner_page"
+            ),
+            IndexModel(
+                [("owner_id", ASCENDING), ("task_days", ASCENDING), ("_id", ASCENDING)],
+                name="owner_weekday",
+            ),
+            IndexModel(
+                [("owner_id", ASCENDING), ("group", ASCENDING), ("_id", ASCENDING)],
+                name="owner_group",
+            ),
+            IndexModel(
+                [("owner_id", ASCENDING), ("type", ASCENDING), ("_id", ASCENDING)],
+                name="owner_type",
+            ),
+            IndexModel(
+                [
+                    ("owner_id", ASCENDING),
+                    ("ikigai_category", ASCENDING),
+                    ("_id", ASCENDING),
+                ],
+                name="owner_category",
+            ),
+            IndexModel(
+                [("ikigai_category", ASCENDING)],
+                name="pending_category",
+                partialFilterExpression={"ikigai_category": "pending"},
+            ),
+        ]
 
 
 class HabitTemplate(Document):
@@ -133,6 +151,7 @@ class HabitTemplate(Document):
     color: str
     group: Optional[str] = None
     type: str
+    ikigai_category: Optional[str] = None
 
     goal: Goal
     task_days: List[str]
@@ -155,6 +174,16 @@ class HabitTemplate(Document):
         name = "habit_templates"
 
 
+class IkigaiClassification(Document):
+    key: str
+    category: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "ikigai_classifications"
+        indexes = [IndexModel([("key", ASCENDING)], unique=True)]
+
+
 class CompletionEntry(BaseModel):
     habit_id: ObjectId
     title: str
@@ -177,12 +206,40 @@ class DailyCompletions(Document):
 
     class Settings:
         name = "daily_completions"
+        indexes = [
+            IndexModel(
+                [("user_id", ASCENDING), ("date", ASCENDING)],
+                name="user_date",
+                unique=True,
+            )
+        ]
 
     class Config:
         arbitrary_types_allowed = True
         json_encoders = {ObjectId: str}
 
 
+class HabitRollup(Document):
+    """Totales por hábito mantenidos en cada cambio de progreso."""
+
+    habit_id: ObjectId
+    owner_id: ObjectId
+    total_days: int = 0
+    completed_days: int = 0
+    last_completed: Optional[date] = None
+
+    model_config = ConfigDict(
+        arbitrary_types_allowed=True, json_encoders={ObjectId: str}
+    )
+
+    class Settings:
+        name = "habit_rollups"
+        indexes = [
+            IndexModel([("habit_id", ASCENDING)], unique=True),
+            IndexModel([("owner_id", ASCENDING)]),
+        ]
+
+
 class UpdateProgressInput(BaseModel):
     habit_id: str
     date: date
@@ -198,16 +255,93 @@ class CalendarDayStats(BaseModel):
 
 class JournalQuestion(Document):
     date: date
-    question: str
+    question: Optional[str] = None
+    claimed_at: Optional[datetime] = None
 
     class Settings:
         name = "journal_question"
+        indexes = [IndexModel([("date", ASCENDING)], unique=True)]
 
     class Config:
         arbitrary_types_allowed = True
         json_encoders = {ObjectId: str}
 
 
+class SchedulerLease(Document):
+    name: str
+    holder: str
+    expires_at: datetime
+
+    class Settings:
+        name = "scheduler_leases"
+        indexes = [IndexModel([("name", ASCENDING)], unique=True)]
+
+
+class RevokedToken(Document):
+    """Revocación de un token (``kind="token"``, key=jti), de todos los tokens
+    de un usuario (``"user"``) o de todos (``"all"``) emitidos antes de
+    ``cutoff``. Se borra sola cuando ya no queda token vigente afectado."""
+
+    kind: str
+    key: str
+    cutoff: Optional[datetime] = None
+    expires_at: datetime
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "revoked_tokens"
+        indexes = [
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+            IndexModel([("created_at", ASCENDING)]),
+        ]
+
+
+class ResourceRevision(Document):
+    """Versión de los datos de un usuario en un ``scope`` (hábitos, días,
+    perfil, diario), o de datos compartidos con ``user_id=revisions.GLOBAL``
+    (templates). Cambia después de cada escritura y sirve de validador para
+    los GET condicionales."""
+
+    user_id: ObjectId
+    scope: str
+    revision: str
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    model_config = ConfigDict(
+        arbitrary_types_allowed=True, json_encoders={ObjectId: str}
+    )
+
+    class Settings:
+        name = "resource_revisions"
+        indexes = [
+            IndexModel(
+                [("user_id", ASCENDING), ("scope", ASCENDING)],
+                name="user_scope",
+                unique=True,
+            )
+        ]
+
+
+class BackgroundJob(Document):
+    kind: str
+    owner_id: ObjectId
+    status: str = "running"
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(
+        arbitrary_types_allowed=True, json_encoders={ObjectId: str}
+    )
+
+    class Settings:
+        name = "background_jobs"
+        indexes = [
+            IndexModel([("created_at", ASCENDING)], expireAfterSeconds=7 * 24 * 3600)
+        ]
+
+
 class JournalEntry(BaseModel):
     date: date
     entry: str
@@ -219,11 +353,58 @@ class JournalEntry(BaseModel):
 
 class Journal(Document):
     user_id: ObjectId
+    # Formato antiguo; las entradas nuevas van a JournalEntryRecord y las
+    # existentes se migran con `python manage.py journal --migrate`.
     entries: List[JournalEntry] = []
 
     class Settings:
         name = "journal"
+        indexes = [IndexModel([("user_id", ASCENDING)])]
 
     class Config:
         arbitrary_types_allowed = True
         json_encoders = {ObjectId: str}
+
+
+class JournalEntryRecord(Document):
+    """Una entrada del diario; reemplaza al arreglo embebido ``Journal.entries``."""
+
+    user_id: ObjectId
+    date: date
+    entry: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    model_config = ConfigDict(
+        arbitrary_types_allowed=True, json_encoders={ObjectId: str}
+    )
+
+    class Settings:
+        name = "journal_entries"
+        indexes = [
+            IndexModel(
+                [("user_id", ASCENDING), ("date", ASCENDING), ("_id", ASCENDING)],
+                name="user_date",
+            ),
+            IndexModel(
+                [("user_id", ASCENDING), ("entry", TEXT)],
+                name="user_entry_text",
+                default_language="spanish",
+            ),
+        ]
+
+
+DOCUMENT_MODELS = [
+    User,
+    Habit,
+    HabitTemplate,
+    IkigaiClassification,
+    DailyCompletions,
+    HabitRollup,
+    Journal,
+    JournalEntryRecord,
+    JournalQuestion,
+    SchedulerLease,
+    RevokedToken,
+    ResourceRevision,
+    BackgroundJob,
+]
@@ -1,5 +1,6 @@
-from typing import List
-from fastapi import APIRouter, Depends, status
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, status
 from schemas.habits import HabitProgress
 from schemas.roles import TokenData
 from utils.dependencies import require_admin
@@ -11,12 +12,32 @@ service = AdminService()
 
 @router.get("/user-progress/{user_id}", response_model=List[HabitProgress])
 async def get_user_progress(
-    user_id: str, admin: TokenData = Depends(require_admin)
+    user_id: str,
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    admin: TokenData = Depends(require_admin),
 ) -> List[HabitProgress]:
-    return await service.get_user_progress(user_id, admin)
+    return await service.get_user_progress(user_id, admin, start, end)
 
 
 @router.delete("/habit/{habit_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def admin_delete_habit(habit_id: str, admin: TokenData = Depends(require_admin)):
     await service.delete_habit(habit_id, admin)
     return None
+
+
+@router.post("/revoke/user/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_user_tokens(user_id: str, admin: TokenData = Depends(require_admin)):
+    await service.revoke_user_tokens(user_id, admin)
+    return None
+
+
+@router.post("/revoke/all", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_all_tokens(admin: TokenData = Depends(require_admin)):
+    await service.revoke_all_tokens(admin)
+    return None
+
+
+@router.get("/metrics")
+async def get_metrics(admin: TokenData = Depends(require_admin)) -> dict:
+    return await service.get_metrics(admin)
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Depends, status
 from typing import Dict
 from schemas.requests import UserCreate
 from schemas.roles import UserOut, Token
 from apps.auth.authService import AuthService
+from utils.dependencies import get_current_token
+from utils.token_cache import VerifiedToken
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 service = AuthService()
@@ -16,3 +18,9 @@ async def register_user(user_in: UserCreate):
 @router.post("/login", response_model=Token)
 async def login(form_data: Dict[str, str]):
     return await service.login_for_access_token(form_data)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(token: VerifiedToken = Depends(get_current_token)):
+    await service.logout(token)
+    return None
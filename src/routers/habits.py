@@ -1,16 +1,26 @@
-from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from typing import List, Optional
 
-from models.models import DailyCompletions, Habit
+from models.models import Habit
 from schemas.habits import HabitCreate, HabitUpdate, HabitOut, HabitProgress
+from schemas.jobs import JobOut
 from schemas.templates import (
     TemplateHabitCreate,
     TemplateHabitOut,
     TemplateHabitUpdate,
 )
-from apps.habits.habitsService import HabitsService
-from utils.dependencies import get_current_user
+from apps.habits.habitsService import (
+    HABITS_MAX_PAGE_SIZE,
+    HABITS_PAGE_SIZE,
+    HabitsService,
+)
+from apps.habits.templateCatalogCache import TEMPLATE_CACHE_MAX_AGE
+from utils import revisions
+from utils.dependencies import conditional_get, get_current_user
+from utils.fast_json import json_response
+from utils.http_cache import cached_response
 from schemas.roles import TokenData
 
 router = APIRouter(prefix="/habits", tags=["habits"])
@@ -25,7 +35,13 @@ async def create_habit(
     return await service.create_habit(payload, user.user_id)
 
 
-@router.get("/progress", response_model=List[HabitProgress])
+@router.get(
+    "/progress",
+    response_model=List[HabitProgress],
+    dependencies=[
+        Depends(conditional_get(revisions.HABITS, revisions.DAILY_COMPLETIONS))
+    ],
+)
 async def get_progress(
     user: TokenData = Depends(get_current_user),
 ) -> List[HabitProgress]:
@@ -34,9 +50,16 @@ async def get_progress(
 
 @router.get("/templates", response_model=List[TemplateHabitOut])
 async def list_templates(
+    request: Request,
     user: TokenData = Depends(get_current_user),
-) -> List[TemplateHabitOut]:
-    return await service.list_templates()
+) -> Response:
+    catalog = await service.get_template_catalog()
+    return cached_response(
+        request,
+        catalog.body,
+        catalog.etag,
+        {"Cache-Control": f"private, max-age={TEMPLATE_CACHE_MAX_AGE}"},
+    )
 
 
 @router.get("/{habit_id}")
@@ -47,9 +70,43 @@ async def get_habit(habit_id: str):
     return habit
 
 
-@router.get("/", response_model=List[HabitOut])
-async def list_habits(user: TokenData = Depends(get_current_user)) -> List[HabitOut]:
-    return await service.list_habits(user)
+@router.get(
+    "/",
+    response_model=List[HabitOut],
+    dependencies=[Depends(conditional_get(revisions.HABITS))],
+)
+async def list_habits(
+    response: Response,
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        le=HABITS_MAX_PAGE_SIZE,
+        description="Sin limit ni cursor devuelve todos; con cursor, "
+        f"{HABITS_PAGE_SIZE} por defecto",
+    ),
+    cursor: Optional[str] = Query(None),
+    group: Optional[str] = Query(None),
+    habit_type: Optional[str] = Query(None, alias="type"),
+    ikigai_category: Optional[str] = Query(None),
+    weekday: Optional[str] = Query(None, description="Mon, Tue, ..., Sun"),
+    include_total: bool = Query(False),
+    user: TokenData = Depends(get_current_user),
+) -> Response:
+    habits, next_cursor, total = await service.list_habits(
+        user,
+        limit=limit,
+        cursor=cursor,
+        group=group,
+        habit_type=habit_type,
+        ikigai_category=ikigai_category,
+        weekday=weekday,
+        include_total=include_total,
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    return json_response(habits, response)
 
 
 @router.put("/{habit_id}", response_model=HabitOut)
@@ -63,30 +120,30 @@ async def update_habit(
 
 
 @router.delete("/{habit_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_habit(habit_id: str, user: TokenData = Depends(get_current_user)):
-    await service.delete_habit(habit_id)
-    dailies = await DailyCompletions.find({"user_id": ObjectId(user.user_id)}).to_list()
-    for daily_completion in dailies:
-        completions_before = len(daily_completion.completions)
-        daily_completion.completions = [
-            c for c in daily_completion.completions if str(c.habit_id) != habit_id
-        ]
-        if len(daily_completion.completions) < completions_before:
-            daily_completion.overall_percentage = (
-                sum(c.percentage for c in daily_completion.completions)
-                / len(daily_completion.completions)
-                if daily_completion.completions
-                else 0.0
-            )
-            daily_completion.day_completed = (
-                all([c.completed for c in daily_completion.completions])
-                if daily_completion.completions
-                else False
-            )
-            await daily_completion.save()
+async def delete_habit(
+    habit_id: str,
+    background: bool = False,
+    user: TokenData = Depends(get_current_user),
+):
+    job = await service.delete_habit(habit_id, user, background)
+    if job is not None:
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(job)
+        )
     return None
 
 
+@router.get("/jobs/{job_id}", response_model=JobOut)
+async def get_job(job_id: str, user: TokenData = Depends(get_current_user)) -> JobOut:
+    """Estado de un job lanzado con ``?background=true``.
+
+    El job corre en el worker que atendió el request: si ese worker se reinicia
+    antes de terminar, el job se reporta ``failed`` una vez pasados
+    ``JOB_TIMEOUT_SECONDS`` desde que se creó.
+    """
+    return await service.get_job(job_id, user)
+
+
 @router.post(
     "/templates", response_model=TemplateHabitOut, status_code=status.HTTP_201_CREATED
 )
@@ -28,9 +28,9 @@ async def update_ikigai_content(
     return await service.update_content(payload, user)
 
 
-@router.delete("/{content_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{owner_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_ikigai_content(
-    content_id: str, admin: TokenData = Depends(require_admin)
+    owner_id: str, admin: TokenData = Depends(require_admin)
 ):
-    await service.delete_content(content_id)
+    await service.delete_content(owner_id)
     return None
@@ -1,13 +1,24 @@
-from datetime import datetime
-from fastapi import APIRouter, Depends, status
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, Query, Response, status
 from typing import List, Optional
-from apps.journal.journalService import JournalService
-from schemas.journal import JournalEntryCreate, JournalEntryOut, JournalQuestionOut
+from apps.journal.journalService import (
+    JOURNAL_MAX_PAGE_SIZE,
+    JOURNAL_PAGE_SIZE,
+    JournalService,
+)
+from schemas.journal import (
+    JournalEntryCreate,
+    JournalEntryOut,
+    JournalQuestionOut,
+    JournalSearchHit,
+)
 from schemas.roles import TokenData
-from utils.dependencies import get_current_user
+from utils import revisions
+from utils.dependencies import conditional_get, get_current_user
 
 router = APIRouter(prefix="/journal", tags=["journal"])
 service = JournalService()
+if_changed = Depends(conditional_get(revisions.JOURNAL))
 
 
 @router.post(
@@ -23,6 +34,7 @@ async def create_journal_entry(
     "/entry/{day}",
     response_model=Optional[JournalEntryOut],
     status_code=status.HTTP_201_CREATED,
+    dependencies=[if_changed],
 )
 async def get_entry(day: str, user: TokenData = Depends(get_current_user)):
     dt = datetime.strptime(day, "%Y-%m-%d").date()
@@ -34,9 +46,32 @@ async def get_entry(day: str, user: TokenData = Depends(get_current_user)):
     "/entries",
     response_model=List[JournalEntryOut],
     status_code=status.HTTP_201_CREATED,
+    dependencies=[if_changed],
 )
-async def get_entries(user: TokenData = Depends(get_current_user)):
-    return await service.get_journal_entries(user)
+async def get_entries(
+    response: Response,
+    limit: int = Query(JOURNAL_PAGE_SIZE, ge=1, le=JOURNAL_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    user: TokenData = Depends(get_current_user),
+):
+    entries, next_cursor = await service.get_journal_entries(
+        user, limit=limit, cursor=cursor, start=start, end=end
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return entries
+
+
+@router.get("/search", response_model=List[JournalSearchHit], dependencies=[if_changed])
+async def search_entries(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(JOURNAL_PAGE_SIZE, ge=1, le=JOURNAL_MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    user: TokenData = Depends(get_current_user),
+):
+    return await service.search_journal_entries(user, q, limit=limit, offset=offset)
 
 
 @router.get(
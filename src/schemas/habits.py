@@ -1,5 +1,5 @@
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from bson import ObjectId
 from pydantic import (
     BaseModel,
@@ -87,3 +87,4 @@ class HabitProgress(BaseModel):
     total_days: int
     completed_days: int
     completion_rate: float
+    last_completed: Optional[date] = None
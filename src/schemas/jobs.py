@@ -0,0 +1,20 @@
+from typing import Optional
+from datetime import datetime
+from bson import ObjectId
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+class JobOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+    id: str = Field(alias="_id")
+    kind: str
+    status: str
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    @field_validator("id", mode="before")
+    def _coerce_id(cls, v):
+        return str(v) if isinstance(v, ObjectId) else v
@@ -12,6 +12,12 @@ class JournalEntryOut(BaseModel):
     entry: str
 
 
+class JournalSearchHit(BaseModel):
+    date: datetime
+    snippet: str
+    score: float
+
+
 class JournalOut(BaseModel):
     user_id: str
     entries: List[JournalEntryOut]
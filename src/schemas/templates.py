@@ -49,6 +49,7 @@ class TemplateHabitOut(BaseModel):
     color: str
     group: Optional[str]
     type: str
+    ikigai_category: Optional[str] = None
     goal: Goal
     task_days: List[str]
     reminders: List[str]
@@ -1,17 +1,74 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from schemas.roles import TokenData
 import os
+import time
+import uuid
 
 SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 
+# Costo de bcrypt. Los hashes con otro costo se rehacen en el siguiente login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+BCRYPT_MIN_ROUNDS = int(os.getenv("BCRYPT_MIN_ROUNDS", 10))
+BCRYPT_MAX_ROUNDS = int(os.getenv("BCRYPT_MAX_ROUNDS", 16))
+BCRYPT_TARGET_MS = float(os.getenv("BCRYPT_TARGET_MS", 250))
+# Calibrar al iniciar puede dar costos distintos en cada worker y hacer que
+# los hashes se rehagan de ida y vuelta; con varios workers es mejor fijar
+# BCRYPT_ROUNDS con `python manage.py bcrypt`.
+BCRYPT_CALIBRATE = os.getenv("BCRYPT_CALIBRATE", "false").lower() in ("1", "true")
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+def set_bcrypt_rounds(rounds: int) -> None:
+    pwd_context.update(
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+def get_bcrypt_rounds() -> int:
+    return pwd_context.to_dict()["bcrypt__default_rounds"]
+
+
+set_bcrypt_rounds(BCRYPT_ROUNDS)
+
+
+def time_bcrypt_hash(rounds: int, samples: int = 3) -> float:
+    """Milisegundos (mediana) que toma un hash con ``rounds``."""
+    handler = pwd_context.handler("bcrypt").using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash("calibration-password")
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def calibrate_bcrypt_rounds(
+    target_ms: float = BCRYPT_TARGET_MS,
+    min_rounds: int = BCRYPT_MIN_ROUNDS,
+    max_rounds: int = BCRYPT_MAX_ROUNDS,
+) -> Tuple[int, float]:
+    """Mayor costo cuyo hash no supera ``target_ms`` en esta máquina.
+
+    Cada ronda extra duplica el tiempo, así que se sube mientras el doble del
+    tiempo medido quepa en el objetivo. Nunca baja de ``min_rounds``.
+    Devuelve las rondas elegidas y su tiempo medido.
+    """
+    rounds = min_rounds
+    elapsed = time_bcrypt_hash(rounds)
+    while rounds < max_rounds and elapsed * 2 <= target_ms:
+        rounds += 1
+        elapsed = time_bcrypt_hash(rounds)
+    return rounds, elapsed
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -20,23 +77,37 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verifica y, si el hash usa otro costo, devuelve el hash nuevo."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
+    now = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+        expire = now + timedelta(minutes=15)
+    # iat y jti permiten revocar un token puntual o todos los emitidos antes.
+    to_encode.update({"exp": expire, "iat": now, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def decode_access_token(token: str) -> Optional[TokenData]:
+def decode_access_claims(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        role: str = payload.get("role")
-        if user_id is None or role is None:
-            return None
-        return TokenData(user_id=user_id, role=role)
     except JWTError:
         return None
+    if payload.get("sub") is None or payload.get("role") is None:
+        return None
+    return payload
+
+
+def decode_access_token(token: str) -> Optional[TokenData]:
+    payload = decode_access_claims(token)
+    if payload is None:
+        return None
+    return TokenData(user_id=payload["sub"], role=payload["role"])
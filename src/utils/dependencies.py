@@ -1,21 +1,32 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
-from utils.auth_utils import decode_access_token
+from apps.auth.tokenRevocation import revocation_list
+from utils import revisions
+from utils.http_cache import etag_matches, revision_etag
+from utils.token_cache import VerifiedToken, token_cache
 from schemas.roles import TokenData
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
+async def get_current_token(token: str = Depends(oauth2_scheme)) -> VerifiedToken:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudo validar las credenciales",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    token_data = decode_access_token(token)
-    if token_data is None:
+    # Firma y expiración se verifican una vez por token; la revocación se
+    # revisa en cada request contra la lista en memoria.
+    verified = token_cache.verify(token)
+    if verified is None or revocation_list.is_revoked(verified):
         raise credentials_exception
-    return token_data
+    return verified
+
+
+async def get_current_user(
+    token: VerifiedToken = Depends(get_current_token),
+) -> TokenData:
+    return token.user
 
 
 async def require_admin(current_user: TokenData = Depends(get_current_user)):
@@ -25,3 +36,31 @@ async def require_admin(current_user: TokenData = Depends(get_current_user)):
             detail="Permisos insuficientes: se requiere rol de administrador",
         )
     return current_user
+
+
+def conditional_get(*scopes: str):
+    """Dependencia para GET de datos del usuario que dependen de ``scopes``.
+
+    Si el ``If-None-Match`` del cliente coincide con la revisión actual
+    responde 304 antes de leer o serializar el cuerpo; si no, deja el ETag
+    en la respuesta.
+    """
+
+    async def dependency(
+        request: Request,
+        response: Response,
+        user: TokenData = Depends(get_current_user),
+    ) -> None:
+        current = await revisions.current(user.user_id, scopes)
+        etag = revision_etag(
+            [user.user_id, request.url.path, request.url.query]
+            + [current.get(scope, "") for scope in scopes]
+        )
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+            )
+        response.headers.update(headers)
+
+    return dependency
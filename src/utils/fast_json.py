@@ -0,0 +1,36 @@
+from typing import Any, Optional
+
+import orjson
+from bson import ObjectId
+from fastapi import Response
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} no es serializable a JSON")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+
+class FastJSONResponse(Response):
+    """JSON con orjson, sin pasar por ``jsonable_encoder`` ni Pydantic.
+
+    El contenido ya debe tener la forma final de la respuesta.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(content: Any, response: Optional[Response] = None) -> Response:
+    """Arma la respuesta conservando los headers que dejaron las dependencias
+    en ``response`` (FastAPI no los copia si se devuelve un ``Response``)."""
+    fast = FastJSONResponse(content)
+    if response is not None:
+        fast.headers.raw.extend(response.headers.raw)
+    return fast
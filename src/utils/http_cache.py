@@ -0,0 +1,42 @@
+import hashlib
+from typing import Dict, Iterable, Optional
+
+from fastapi import Request, Response, status
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def revision_etag(parts: Iterable[str]) -> str:
+    """ETag débil a partir de revisiones y de lo que identifica la vista
+    (usuario, ruta, query), sin mirar el cuerpo."""
+    digest = hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+    return 'W/"' + digest[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparación débil de ``If-None-Match`` (RFC 9110, sección 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def cached_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    headers: Optional[Dict[str, str]] = None,
+    media_type: str = "application/json",
+) -> Response:
+    """Responde ``body`` o un 304 vacío si el cliente ya tiene esa versión."""
+    headers = {**(headers or {}), "ETag": etag}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
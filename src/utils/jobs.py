@@ -0,0 +1,78 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional, Set
+
+from bson import ObjectId
+
+from models.models import BackgroundJob
+
+# Los jobs corren dentro del worker que los creó y no sobreviven a un reinicio:
+# uno que sigue "running" pasado este tiempo se da por perdido.
+JOB_TIMEOUT_SECONDS = int(os.getenv("JOB_TIMEOUT_SECONDS", 15 * 60))
+STALE_JOB_ERROR = "Interrumpido: el worker que lo ejecutaba se detuvo"
+
+_running: Set[asyncio.Task] = set()
+
+
+async def _run(job: BackgroundJob, work: Callable[[], Awaitable[dict]]) -> None:
+    try:
+        result = await work()
+    except Exception as exc:
+        await job.set(
+            {
+                BackgroundJob.status: "failed",
+                BackgroundJob.error: str(exc),
+                BackgroundJob.finished_at: datetime.utcnow(),
+            }
+        )
+        return
+    await job.set(
+        {
+            BackgroundJob.status: "done",
+            BackgroundJob.result: result,
+            BackgroundJob.finished_at: datetime.utcnow(),
+        }
+    )
+
+
+async def start_job(
+    kind: str, owner_id: str, work: Callable[[], Awaitable[dict]]
+) -> BackgroundJob:
+    """Registra el job en Mongo y lo ejecuta fuera del request.
+
+    El estado queda en ``background_jobs`` para que cualquier worker pueda
+    responder por él.
+    """
+    job = BackgroundJob(kind=kind, owner_id=ObjectId(owner_id))
+    await job.insert()
+    task = asyncio.create_task(_run(job, work))
+    _running.add(task)
+    task.add_done_callback(_running.discard)
+    return job
+
+
+async def fail_stale_jobs(job_id: Optional[ObjectId] = None) -> int:
+    """Marca como ``failed`` los jobs ``running`` creados hace más de
+    ``JOB_TIMEOUT_SECONDS`` (o solo ``job_id``). Devuelve cuántos cambió."""
+    now = datetime.utcnow()
+    query = {
+        "status": "running",
+        "created_at": {"$lt": now - timedelta(seconds=JOB_TIMEOUT_SECONDS)},
+    }
+    if job_id is not None:
+        query["_id"] = job_id
+    result = await BackgroundJob.get_motor_collection().update_many(
+        query,
+        {"$set": {"status": "failed", "error": STALE_JOB_ERROR, "finished_at": now}},
+    )
+    return result.modified_count
+
+
+async def get_job(job_id: str) -> Optional[BackgroundJob]:
+    if not ObjectId.is_valid(job_id):
+        return None
+    job = await BackgroundJob.get(ObjectId(job_id))
+    if job is not None and job.status == "running" and await fail_stale_jobs(job.id):
+        job = await BackgroundJob.get(job.id)
+    return job
@@ -0,0 +1,48 @@
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from models.models import SchedulerLease
+
+
+class LeaderLease:
+    """Lease en Mongo para que solo un worker ejecute una tarea periódica.
+
+    El dueño renueva el lease en cada ``acquire``; si deja de hacerlo, otro
+    worker lo toma cuando expira.
+    """
+
+    def __init__(self, name: str, ttl_seconds: int):
+        self.name = name
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+
+    async def acquire(self) -> bool:
+        now = datetime.utcnow()
+        try:
+            lease = await SchedulerLease.get_motor_collection().find_one_and_update(
+                {
+                    "name": self.name,
+                    "$or": [{"holder": self.holder}, {"expires_at": {"$lt": now}}],
+                },
+                {"$set": {"holder": self.holder, "expires_at": now + self.ttl}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            lease = None
+        self.is_leader = lease is not None and lease["holder"] == self.holder
+        return self.is_leader
+
+    async def release(self) -> None:
+        if not self.is_leader:
+            return
+        await SchedulerLease.get_motor_collection().delete_one(
+            {"name": self.name, "holder": self.holder}
+        )
+        self.is_leader = False
@@ -0,0 +1,45 @@
+import uuid
+from datetime import datetime
+from typing import Dict, Sequence
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from models.models import ResourceRevision
+
+HABITS = "habits"
+DAILY_COMPLETIONS = "daily_completions"
+PROFILE = "user"
+JOURNAL = "journal"
+TEMPLATES = "templates"
+
+# Dueño de las revisiones que comparten todos los usuarios (``TEMPLATES``).
+GLOBAL = ObjectId("000000000000000000000000")
+
+
+async def bump(user_id, *scopes: str) -> None:
+    """Marca como modificados los ``scopes`` del usuario.
+
+    Se llama después de escribir: si un GET lee la revisión anterior junto con
+    los datos nuevos, el cliente solo se pierde un 304.
+    """
+    now = datetime.utcnow()
+    await ResourceRevision.get_motor_collection().bulk_write(
+        [
+            UpdateOne(
+                {"user_id": ObjectId(user_id), "scope": scope},
+                {"$set": {"revision": uuid.uuid4().hex, "updated_at": now}},
+                upsert=True,
+            )
+            for scope in scopes
+        ],
+        ordered=False,
+    )
+
+
+async def current(user_id, scopes: Sequence[str]) -> Dict[str, str]:
+    cursor = ResourceRevision.get_motor_collection().find(
+        {"user_id": ObjectId(user_id), "scope": {"$in": list(scopes)}},
+        {"_id": 0, "scope": 1, "revision": 1},
+    )
+    return {doc["scope"]: doc["revision"] async for doc in cursor}
@@ -0,0 +1,74 @@
+import hashlib
+import os
+import time
+from typing import NamedTuple, Optional
+
+from cachetools import TLRUCache
+
+from schemas.roles import TokenData
+from utils.auth_utils import decode_access_claims
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+
+
+class VerifiedToken(NamedTuple):
+    user: TokenData
+    jti: str
+    issued_at: float
+    expires_at: float
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class VerifiedTokenCache:
+    """LRU de JWT ya verificados, indexado por hash del token.
+
+    Cada entrada vence junto con el token, así que un token expirado nunca
+    se sirve desde aquí. La revocación se revisa aparte en cada request.
+    """
+
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE):
+        self._cache = TLRUCache(
+            maxsize=maxsize,
+            ttu=lambda _key, value, _now: value.expires_at,
+            timer=time.time,
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def verify(self, token: str) -> Optional[VerifiedToken]:
+        key = token_key(token)
+        verified = self._cache.get(key)
+        if verified is not None:
+            self.hits += 1
+            return verified
+
+        self.misses += 1
+        claims = decode_access_claims(token)
+        if claims is None:
+            return None
+        verified = VerifiedToken(
+            user=TokenData(user_id=claims["sub"], role=claims["role"]),
+            # Los tokens emitidos antes de agregar jti se identifican por su hash.
+            jti=claims.get("jti") or key,
+            issued_at=float(claims.get("iat", 0)),
+            # Sin exp no se guarda: TLRUCache descarta entradas ya vencidas.
+            expires_at=float(claims.get("exp") or time.time()),
+        )
+        self._cache[key] = verified
+        return verified
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": self._cache.currsize,
+            "maxsize": self._cache.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+token_cache = VerifiedTokenCache()
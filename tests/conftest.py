@@ -9,7 +9,8 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 
 from main import app
-from models.models import User, Habit, HabitTemplate, DailyCompletions
+from apps.habits.templateCatalogCache import template_catalog_cache
+from models.models import DOCUMENT_MODELS, User, Habit, HabitTemplate
 from utils.auth_utils import get_password_hash
 from jose import jwt
 from utils.auth_utils import SECRET_KEY, ALGORITHM
@@ -37,12 +38,7 @@ def init_db():
     asyncio.get_event_loop().run_until_complete(
         init_beanie(
             database=test_db,
-            document_models=[
-                User,
-                Habit,
-                HabitTemplate,
-                DailyCompletions,
-            ],
+            document_models=DOCUMENT_MODELS,
         )
     )
     yield
@@ -97,12 +93,14 @@ async def clean_db():
     await User.delete_all()
     await Habit.delete_all()
     await HabitTemplate.delete_all()
+    await template_catalog_cache.invalidate()
 
     yield
 
     await User.delete_all()
     await Habit.delete_all()
     await HabitTemplate.delete_all()
+    await template_catalog_cache.invalidate()
 
     client.close()
 
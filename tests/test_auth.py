@@ -68,3 +68,157 @@ def test_token_creation_and_validation():
 def test_protected_requires_auth(client):
     r = client.get("/habits/")
     assert r.status_code == 401
+
+
+def test_password_hasher_rejects_when_saturated():
+    import asyncio
+    from fastapi import HTTPException
+    from utils.password_pool import PasswordHasher
+
+    hasher = PasswordHasher(workers=1, max_pending=0)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(hasher.hash("secret"))
+    assert exc.value.status_code == 503
+    assert hasher.stats()["rejected"] == 1
+
+
+def test_login_rehashes_password_with_configured_rounds(client, user_factory):
+    import asyncio
+    from models.models import User
+    from utils.auth_utils import get_bcrypt_rounds, set_bcrypt_rounds
+
+    new_user = user_factory("rehash")
+    client.post("/auth/register", json=new_user)
+    original = get_bcrypt_rounds()
+    set_bcrypt_rounds(original - 1)
+    try:
+        resp = client.post("/auth/login", json=new_user)
+        assert resp.status_code == 200
+        user = asyncio.get_event_loop().run_until_complete(
+            User.find_one(User.email == new_user["email"])
+        )
+        assert user.hashed_password.startswith(f"$2b${original - 1:02d}$")
+    finally:
+        set_bcrypt_rounds(original)
+
+
+def test_logout_revokes_token(client, user_token):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    assert client.get("/habits/", headers=headers).status_code == 200
+
+    resp = client.post("/auth/logout", headers=headers)
+    assert resp.status_code == 204
+    assert client.get("/habits/", headers=headers).status_code == 401
+
+
+def _verified_token(user_id, issued_at, jti=None):
+    import time
+    import uuid
+    from schemas.roles import TokenData
+    from utils.token_cache import VerifiedToken
+
+    return VerifiedToken(
+        user=TokenData(user_id=user_id, role="user"),
+        jti=jti or uuid.uuid4().hex,
+        issued_at=issued_at,
+        expires_at=time.time() + 900,
+    )
+
+
+def test_admin_revoke_user_rejects_that_users_tokens(client, user_token, admin_token):
+    claims = jwt.decode(user_token, SECRET_KEY, algorithms=[ALGORITHM])
+    headers = {"Authorization": f"Bearer {user_token}"}
+    admin_headers = {"Authorization": f"Bearer {admin_token}"}
+    assert client.get("/habits/", headers=headers).status_code == 200
+
+    resp = client.post(f"/admin/revoke/user/{claims['sub']}", headers=admin_headers)
+    assert resp.status_code == 204
+    assert client.get("/habits/", headers=headers).status_code == 401
+    assert client.get("/admin/metrics", headers=admin_headers).status_code == 200
+
+
+def test_revoke_user_only_cuts_that_users_earlier_tokens():
+    import asyncio
+    import time
+    import uuid
+    from apps.auth.tokenRevocation import RevocationList
+
+    user_id, other_id = uuid.uuid4().hex, uuid.uuid4().hex
+    revocations = RevocationList()
+    asyncio.get_event_loop().run_until_complete(revocations.revoke_user(user_id))
+
+    earlier = time.time() - 10
+    assert revocations.is_revoked(_verified_token(user_id, earlier))
+    assert not revocations.is_revoked(_verified_token(other_id, earlier))
+    assert not revocations.is_revoked(_verified_token(user_id, time.time() + 10))
+
+
+def test_revoke_all_cuts_every_earlier_token():
+    import asyncio
+    import time
+    from apps.auth.tokenRevocation import RevocationList
+    from models.models import RevokedToken
+
+    run = asyncio.get_event_loop().run_until_complete
+    revocations = RevocationList()
+    try:
+        run(revocations.revoke_all())
+        earlier = time.time() - 10
+        assert revocations.is_revoked(_verified_token("u1", earlier))
+        assert revocations.is_revoked(_verified_token("u2", earlier))
+        assert not revocations.is_revoked(_verified_token("u1", time.time() + 10))
+    finally:
+        # El corte global afectaría a los tokens de los demás tests.
+        run(RevokedToken.find(RevokedToken.kind == "all").delete())
+
+
+def test_revocations_reach_other_workers_through_sync():
+    import asyncio
+    import time
+    import uuid
+    from apps.auth.tokenRevocation import RevocationList
+
+    run = asyncio.get_event_loop().run_until_complete
+    writer, reader = RevocationList(), RevocationList()
+    run(reader.sync())
+    before = reader.stats()
+
+    user_id, other_id = uuid.uuid4().hex, uuid.uuid4().hex
+    revoked = _verified_token(user_id, time.time() - 10)
+    still_valid = _verified_token(user_id, time.time() - 10)
+    run(writer.revoke_token(revoked))
+    run(writer.revoke_user(other_id))
+    assert not reader.is_revoked(revoked)
+
+    run(reader.sync())
+    assert reader.is_revoked(revoked)
+    assert not reader.is_revoked(still_valid)
+    assert reader.is_revoked(_verified_token(other_id, time.time() - 10))
+    after = reader.stats()
+    assert after["revoked_tokens"] == before["revoked_tokens"] + 1
+    assert after["revoked_users"] == before["revoked_users"] + 1
+
+
+def test_token_cache_entries_expire_with_the_token():
+    import time
+    from datetime import timedelta
+    from utils.token_cache import VerifiedTokenCache
+
+    cache = VerifiedTokenCache()
+    token = create_access_token(
+        {"sub": "u1", "role": "user"}, expires_delta=timedelta(seconds=2)
+    )
+    claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+    verified = cache.verify(token)
+    assert verified.expires_at == claims["exp"]
+    assert cache.verify(token) is verified
+    assert cache.stats()["size"] == 1
+    assert cache.stats()["hits"] == 1
+
+    time.sleep(max(0.0, claims["exp"] - time.time()) + 0.1)
+    assert cache.stats()["size"] == 0
+    cache.verify(token)
+    assert cache.stats()["misses"] == 2
+    # Una entrada ya vencida no vuelve a guardarse.
+    assert cache.stats()["size"] == 0
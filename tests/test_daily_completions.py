@@ -1,5 +1,5 @@
 import pytest
-from datetime import date
+from datetime import date, timedelta
 from schemas.daily_completions import (
     DailyCompletionsResponse,
     CompletionEntryResponse,
@@ -60,3 +60,345 @@ async def test_create_and_update_daily_completion(client, user_token, clean_db):
 
     resp = client.get(f"/daily-completions/{today}", headers=headers)
     assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_monthly_completion_range_and_projection(client, user_token, clean_db):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    today = date.today()
+
+    habit_payload = {
+        "title": "Stretch",
+        "description": "Stretch for 5 minutes",
+        "icon": "yoga",
+        "color": "#AAFFAA",
+        "group": "Health",
+        "type": "daily",
+        "goal": {"period": "daily", "type": "time", "target": 5, "unit": "min"},
+        "task_days": [today.strftime("%a")],
+        "reminders": [],
+    }
+    resp = client.post("/habits/", json=habit_payload, headers=headers)
+    assert resp.status_code == 201, resp.json()
+
+    resp = client.post("/daily-completions/", json=str(today), headers=headers)
+    assert resp.status_code in (200, 201), resp.json()
+
+    month = today.strftime("%Y-%m")
+    resp = client.get(f"/month-completions/{month}", headers=headers)
+    assert resp.status_code == 200, resp.json()
+    assert [d["date"] for d in resp.json()] == [str(today)]
+
+    resp = client.get(
+        f"/month-completions/{month}?fields=day_completed", headers=headers
+    )
+    assert resp.status_code == 200, resp.json()
+    day = resp.json()[0]
+    assert set(day) == {"_id", "date", "day_completed"}
+
+    resp = client.get(f"/month-completions/{month}?fields=password", headers=headers)
+    assert resp.status_code == 400
+
+
+def _create_habit(client, headers, title, day):
+    payload = {
+        "title": title,
+        "description": f"{title} every day",
+        "icon": "star",
+        "color": "#123456",
+        "group": "Health",
+        "type": "daily",
+        "goal": {"period": "daily", "type": "quantity", "target": 1, "unit": "u"},
+        "task_days": [day.strftime("%a")],
+        "reminders": [],
+    }
+    resp = client.post("/habits/", json=payload, headers=headers)
+    assert resp.status_code == 201, resp.json()
+    return resp.json()["_id"]
+
+
+@pytest.mark.asyncio
+async def test_delete_habit_cascades_to_daily_completions(client, user_token, clean_db):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    today = date.today()
+    keep_id = _create_habit(client, headers, "Keep", today)
+    drop_id = _create_habit(client, headers, "Drop", today)
+
+    client.post("/daily-completions/", json=str(today), headers=headers)
+    client.patch(
+        "/daily-completions/update-progress",
+        json={"habit_id": keep_id, "date": str(today), "progress": 1},
+        headers=headers,
+    )
+
+    resp = client.delete(f"/habits/{drop_id}", headers=headers)
+    assert resp.status_code == 204
+
+    daily = client.get(f"/daily-completions/{today}", headers=headers).json()
+    assert [c["habit_id"] for c in daily["completions"]] == [keep_id]
+    assert daily["overall_percentage"] == 1.0
+    assert daily["day_completed"] is True
+
+
+@pytest.mark.asyncio
+async def test_delete_habit_in_background_reports_job(client, user_token, clean_db):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    today = date.today()
+    habit_id = _create_habit(client, headers, "Background", today)
+    client.post("/daily-completions/", json=str(today), headers=headers)
+
+    resp = client.delete(f"/habits/{habit_id}?background=true", headers=headers)
+    assert resp.status_code == 202, resp.json()
+    job_id = resp.json()["_id"]
+
+    resp = client.get(f"/habits/jobs/{job_id}", headers=headers)
+    assert resp.status_code == 200, resp.json()
+    assert resp.json()["kind"] == "habit_delete_cascade"
+    assert resp.json()["status"] in ("running", "done")
+
+
+@pytest.mark.asyncio
+async def test_interrupted_background_jobs_are_reported_failed(
+    client, user_token, clean_db
+):
+    from datetime import datetime
+    from bson import ObjectId
+    from jose import jwt
+    from models.models import BackgroundJob
+    from utils.auth_utils import ALGORITHM, SECRET_KEY
+    from utils.jobs import JOB_TIMEOUT_SECONDS, STALE_JOB_ERROR, fail_stale_jobs
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+    claims = jwt.decode(user_token, SECRET_KEY, algorithms=[ALGORITHM])
+    owner_id = ObjectId(claims["sub"])
+    old = datetime.utcnow() - timedelta(seconds=2 * JOB_TIMEOUT_SECONDS)
+    stale = BackgroundJob(kind="test", owner_id=owner_id, created_at=old)
+    other_stale = BackgroundJob(kind="test", owner_id=owner_id, created_at=old)
+    recent = BackgroundJob(kind="test", owner_id=owner_id)
+    for job in (stale, other_stale, recent):
+        await job.insert()
+
+    resp = client.get(f"/habits/jobs/{stale.id}", headers=headers)
+    assert resp.json()["status"] == "failed"
+    assert resp.json()["error"] == STALE_JOB_ERROR
+
+    assert await fail_stale_jobs() == 1
+    assert (await BackgroundJob.get(other_stale.id)).status == "failed"
+    assert (await BackgroundJob.get(recent.id)).status == "running"
+    resp = client.get(f"/habits/jobs/{recent.id}", headers=headers)
+    assert resp.json()["status"] == "running"
+
+
+@pytest.mark.asyncio
+async def test_materializing_a_day_twice_returns_the_same_document(
+    client, user_token, clean_db
+):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    today = date.today()
+    _create_habit(client, headers, "Once", today)
+
+    first = client.post("/daily-completions/", json=str(today), headers=headers)
+    second = client.post("/daily-completions/", json=str(today), headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert first.json()["_id"] == second.json()["_id"]
+    assert len(second.json()["completions"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_range_materializes_missing_days_in_order(client, user_token, clean_db):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    start = date.today()
+    next_week = start + timedelta(days=7)
+    _create_habit(client, headers, "Weekly", start)
+    existing = client.post("/daily-completions/", json=str(start), headers=headers)
+
+    resp = client.post(
+        "/daily-completions/range",
+        json={"start": str(start), "end": str(next_week)},
+        headers=headers,
+    )
+    assert resp.status_code == 200, resp.json()
+    days = resp.json()
+    assert [d["date"] for d in days] == [str(start), str(next_week)]
+    assert days[0]["_id"] == existing.json()["_id"]
+
+    too_long = client.post(
+        "/daily-completions/range",
+        json={"start": str(start), "end": str(start + timedelta(days=365))},
+        headers=headers,
+    )
+    assert too_long.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_calendar_stats_follow_progress_updates(client, user_token, clean_db):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    today = date.today()
+    habit_id = _create_habit(client, headers, "Stats", today)
+    client.post("/daily-completions/", json=str(today), headers=headers)
+    params = {"start": str(today), "end": str(today)}
+
+    resp = client.get("/calendar-stats", params=params, headers=headers)
+    assert resp.status_code == 200, resp.json()
+    assert resp.json() == [
+        {
+            "day": str(today),
+            "completed_count": 0,
+            "total_habits": 1,
+            "completion_rate": 0.0,
+        }
+    ]
+
+    client.patch(
+        "/daily-completions/update-progress",
+        json={"habit_id": habit_id, "date": str(today), "progress": 1},
+        headers=headers,
+    )
+    stats = client.get("/calendar-stats", params=params, headers=headers).json()
+    assert stats[0]["completed_count"] == 1
+    assert stats[0]["completion_rate"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_admin_user_progress_per_habit(client, user_token, admin_token, clean_db):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    today = date.today()
+    done_id = _create_habit(client, headers, "Done", today)
+    open_id = _create_habit(client, headers, "Open", today)
+    client.post("/daily-completions/", json=str(today), headers=headers)
+    client.patch(
+        "/daily-completions/update-progress",
+        json={"habit_id": done_id, "date": str(today), "progress": 1},
+        headers=headers,
+    )
+    user_id = client.get("/user/", headers=headers).json()["_id"]
+
+    resp = client.get(
+        f"/admin/user-progress/{user_id}",
+        params={"start": str(today), "end": str(today)},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 200, resp.json()
+    progress = {p["habit_id"]: p for p in resp.json()}
+    assert progress[done_id]["completed_days"] == 1
+    assert progress[done_id]["completion_rate"] == 100.0
+    assert progress[open_id]["total_days"] == 1
+    assert progress[open_id]["completed_days"] == 0
+
+
+@pytest.mark.asyncio
+async def test_habit_progress_reads_rollups(client, user_token, clean_db):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    today = date.today()
+    habit_id = _create_habit(client, headers, "Rollup", today)
+    client.post("/daily-completions/", json=str(today), headers=headers)
+    client.patch(
+        "/daily-completions/update-progress",
+        json={"habit_id": habit_id, "date": str(today), "progress": 1},
+        headers=headers,
+    )
+
+    resp = client.get("/habits/progress", headers=headers)
+    assert resp.status_code == 200, resp.json()
+    assert resp.json() == [
+        {
+            "habit_id": habit_id,
+            "total_days": 1,
+            "completed_days": 1,
+            "completion_rate": 100.0,
+            "last_completed": str(today),
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_habit_progress_recomputes_missing_rollups(client, user_token, clean_db):
+    from bson import ObjectId
+    from apps.habits.habitRollupDBRepository import HabitRollupDBRepository
+    from models.models import HabitRollup
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+    today = date.today()
+    habit_id = _create_habit(client, headers, "Legacy", today)
+    client.post("/daily-completions/", json=str(today), headers=headers)
+    client.patch(
+        "/daily-completions/update-progress",
+        json={"habit_id": habit_id, "date": str(today), "progress": 1},
+        headers=headers,
+    )
+    rollups = HabitRollup.get_motor_collection()
+
+    # Hábito anterior a habit_rollups: descompletar no deja el total negativo.
+    await rollups.delete_many({"habit_id": ObjectId(habit_id)})
+    client.patch(
+        "/daily-completions/update-progress",
+        json={"habit_id": habit_id, "date": str(today), "progress": 0},
+        headers=headers,
+    )
+    progress = client.get("/habits/progress", headers=headers).json()
+    assert [(p["total_days"], p["completed_days"]) for p in progress] == [(1, 0)]
+
+    # Sin escrituras la lectura no calcula nada: lo repone el rebuild.
+    await rollups.delete_many({"habit_id": ObjectId(habit_id)})
+    assert client.get("/habits/progress", headers=headers).json() == []
+    await HabitRollupDBRepository().rebuild()
+    progress = client.get("/habits/progress", headers=headers).json()
+    assert [(p["habit_id"], p["total_days"]) for p in progress] == [(habit_id, 1)]
+
+
+@pytest.mark.asyncio
+async def test_calendar_stats_see_writes_from_other_workers(
+    client, user_token, clean_db
+):
+    from bson import ObjectId
+    from models.models import DailyCompletions
+    from utils import revisions
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+    today = date.today()
+    _create_habit(client, headers, "Shared", today)
+    daily = client.post("/daily-completions/", json=str(today), headers=headers)
+    params = {"start": str(today), "end": str(today)}
+    stats = client.get("/calendar-stats", params=params, headers=headers).json()
+    assert stats[0]["completed_count"] == 0
+
+    # Otro worker escribe en Mongo: este no ve ninguna invalidación local.
+    days = DailyCompletions.get_motor_collection()
+    day = await days.find_one_and_update(
+        {"_id": ObjectId(daily.json()["_id"])},
+        {"$set": {"completions.0.completed": True}},
+    )
+    await revisions.bump(day["user_id"], revisions.DAILY_COMPLETIONS)
+
+    stats = client.get("/calendar-stats", params=params, headers=headers).json()
+    assert stats[0]["completed_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_progress_without_positive_target_counts_against_one(
+    client, user_token, clean_db
+):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    today = date.today()
+    payload = {
+        "title": "Sin meta",
+        "icon": "star",
+        "color": "#123456",
+        "type": "daily",
+        "goal": {"period": "daily", "type": "quantity", "target": -3, "unit": "u"},
+        "task_days": [today.strftime("%a")],
+        "reminders": [],
+    }
+    habit_id = client.post("/habits/", json=payload, headers=headers).json()["_id"]
+    client.post("/daily-completions/", json=str(today), headers=headers)
+
+    resp = client.patch(
+        "/daily-completions/update-progress",
+        json={"habit_id": habit_id, "date": str(today), "progress": 1},
+        headers=headers,
+    )
+    assert resp.status_code == 200, resp.json()
+    entry = resp.json()["completions"][0]
+    assert entry["percentage"] == 1.0
+    assert entry["completed"] is True
+    assert resp.json()["day_completed"] is True
@@ -1,3 +1,6 @@
+import pytest
+
+
 def test_create_habit_missing_fields_returns_422(client, user_token):
     headers = {"Authorization": f"Bearer {user_token}"}
     resp = client.post("/habits/", json={}, headers=headers)
@@ -30,3 +33,313 @@ def test_create_and_get_habit_success(client, user_token):
     r2 = client.get(f"/habits/{data['_id']}", headers=headers)
     assert r2.status_code == 200
     assert r2.json()["_id"] == data["_id"]
+
+
+def test_category_key_ignores_case_accents_and_spacing():
+    from apps.habits.habitsCategoryCache import category_key
+
+    a = {"title": "Meditár", "description": "10  min", "group": None, "type": "daily"}
+    b = {"title": " meditar ", "description": "10 MIN", "group": "", "type": "Daily"}
+    c = {"title": "Leer", "description": "10 min", "group": None, "type": "daily"}
+    assert category_key(a) == category_key(b)
+    assert category_key(a) != category_key(c)
+
+
+def _category_data(title="Meditar"):
+    import uuid
+
+    return {
+        "title": f"{title} {uuid.uuid4().hex[:8]}",
+        "description": "10 min",
+        "group": None,
+        "type": "daily",
+    }
+
+
+@pytest.mark.asyncio
+async def test_category_cache_memory_and_mongo_tiers():
+    from apps.habits.habitsCategoryCache import HabitCategoryCache
+
+    cache = HabitCategoryCache()
+    data = _category_data()
+    assert await cache.get(data) is None
+    assert cache.stats()["db"]["misses"] == 1
+
+    await cache.set(data, "passion")
+    assert await cache.get(data) == "passion"
+    assert cache.stats()["memory"]["hits"] == 1
+    assert cache.stats()["db"]["hits"] == 0
+
+    # Otro worker (o este tras expirar la LRU) la encuentra en Mongo.
+    cache.memory.clear()
+    assert await cache.get(data) == "passion"
+    assert await cache.get(data) == "passion"
+    stats = cache.stats()
+    assert stats["db"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+    assert stats["memory"]["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_classification_is_not_cached(monkeypatch):
+    from apps.habits.habitsCategoryCache import category_cache
+    from apps.habits.habitsClassifier import DEFAULT_CATEGORY, HabitClassifier
+
+    classifier = HabitClassifier()
+    data = _category_data()
+    answers = [None, "vocation"]
+
+    async def classify(data):
+        return answers.pop(0)
+
+    monkeypatch.setattr(classifier, "classify", classify)
+    assert await classifier._resolve(data) == DEFAULT_CATEGORY
+    assert await category_cache.get(data) is None
+
+    assert await classifier._resolve(data) == "vocation"
+    assert await category_cache.get(data) == "vocation"
+
+
+def test_classified_template_seeds_the_category_cache(
+    client, admin_token, user_token, monkeypatch
+):
+    import time
+    from apps.habits.habitsClassifier import classifier
+
+    async def classify(data):
+        return "profession"
+
+    monkeypatch.setattr(classifier, "classify", classify)
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    fields = {**_category_data("Plantilla"), "group": "Trabajo"}
+    template = {
+        **fields,
+        "icon": "briefcase",
+        "color": "#333333",
+        "goal": {"target": 1, "unit": "vez", "period": "daily", "type": "quantity"},
+        "task_days": ["Mon"],
+        "reminders": [],
+    }
+    created = client.post("/habits/templates", json=template, headers=admin).json()
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        catalog = client.get("/habits/templates", headers=admin).json()
+        if any(t["_id"] == created["_id"] and t["ikigai_category"] for t in catalog):
+            break
+        time.sleep(0.05)
+
+    # Un hábito con los mismos campos toma la categoría sin pasar por Gemini.
+    monkeypatch.setattr(classifier, "classify", None)
+    habit = client.post(
+        "/habits/",
+        json=template,
+        headers={"Authorization": f"Bearer {user_token}"},
+    ).json()
+    assert habit["ikigai_category"] == "profession"
+
+
+def test_template_catalog_is_cached_and_invalidated(client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    payload = {
+        "title": "Tomar agua",
+        "description": "8 vasos al día",
+        "icon": "drop",
+        "color": "#00AAFF",
+        "type": "daily",
+        "goal": {"target": 8, "unit": "vasos", "period": "daily", "type": "quantity"},
+        "task_days": ["Mon", "Wed"],
+        "reminders": [],
+    }
+    created = client.post("/habits/templates", json=payload, headers=headers)
+    assert created.status_code == 201
+
+    r = client.get("/habits/templates", headers=headers)
+    assert r.status_code == 200
+    assert created.json()["_id"] in [t["_id"] for t in r.json()]
+    etag = r.headers["ETag"]
+
+    r2 = client.get("/habits/templates", headers={**headers, "If-None-Match": etag})
+    assert r2.status_code == 304
+
+    client.delete(f"/habits/templates/{created.json()['_id']}", headers=headers)
+    r3 = client.get("/habits/templates", headers={**headers, "If-None-Match": etag})
+    assert r3.status_code == 200
+    assert created.json()["_id"] not in [t["_id"] for t in r3.json()]
+
+
+def test_template_catalog_sees_invalidations_from_other_workers(client, admin_token):
+    import asyncio
+    from apps.habits.templateCatalogCache import TemplateCatalogCache
+
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    etag = client.get("/habits/templates", headers=headers).headers["ETag"]
+    created = client.post(
+        "/habits/templates",
+        json={
+            "title": "Estirar",
+            "description": "Antes de dormir",
+            "icon": "stretch",
+            "color": "#AA00FF",
+            "type": "daily",
+            "goal": {"target": 10, "unit": "min", "period": "daily", "type": "time"},
+            "task_days": ["Tue"],
+            "reminders": [],
+        },
+        headers=headers,
+    ).json()
+
+    # Otro worker: su instancia no recibió la invalidación del que escribió.
+    other = TemplateCatalogCache()
+    builds = []
+
+    async def build():
+        builds.append(1)
+        return b"[]" if len(builds) == 1 else created["_id"].encode()
+
+    run = asyncio.get_event_loop().run_until_complete
+    first = run(other.get(build))
+    assert run(other.get(build)) is first
+    assert other.stats()["hits"] == 1
+
+    run(TemplateCatalogCache().invalidate())
+    assert run(other.get(build)).body == created["_id"].encode()
+    assert len(builds) == 2
+
+    r = client.get("/habits/templates", headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert created["_id"] in [t["_id"] for t in r.json()]
+
+
+def test_list_habits_conditional_get(client, user_token):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    r = client.get("/habits/", headers=headers)
+    assert r.status_code == 200
+    etag = r.headers["ETag"]
+
+    r2 = client.get("/habits/", headers={**headers, "If-None-Match": etag})
+    assert r2.status_code == 304
+    assert r2.content == b""
+
+    payload = {
+        "title": "Caminar",
+        "icon": "walk",
+        "color": "#00FF00",
+        "type": "daily",
+        "goal": {"target": 30, "unit": "min", "period": "daily", "type": "time"},
+        "task_days": ["Mon"],
+        "reminders": [],
+    }
+    assert client.post("/habits/", json=payload, headers=headers).status_code == 201
+    r3 = client.get("/habits/", headers={**headers, "If-None-Match": etag})
+    assert r3.status_code == 200
+    assert r3.headers["ETag"] != etag
+
+
+def test_list_habits_paginates_and_filters(client, user_token):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    base = {
+        "icon": "star",
+        "color": "#123456",
+        "type": "daily",
+        "goal": {"target": 1, "unit": "vez", "period": "daily", "type": "quantity"},
+        "reminders": [],
+    }
+    for i in range(5):
+        payload = {
+            **base,
+            "title": f"Hábito {i}",
+            "group": "Salud" if i % 2 else "Estudio",
+            "task_days": ["Mon"] if i < 3 else ["Sat"],
+        }
+        assert client.post("/habits/", json=payload, headers=headers).status_code == 201
+
+    r = client.get("/habits/?limit=2&include_total=true", headers=headers)
+    assert r.status_code == 200
+    assert len(r.json()) == 2
+    assert r.headers["X-Total-Count"] == "5"
+    seen = [h["_id"] for h in r.json()]
+    while "X-Next-Cursor" in r.headers:
+        r = client.get(
+            f"/habits/?limit=2&cursor={r.headers['X-Next-Cursor']}", headers=headers
+        )
+        assert "X-Total-Count" not in r.headers
+        seen += [h["_id"] for h in r.json()]
+    assert len(seen) == len(set(seen)) == 5
+
+    r = client.get("/habits/", headers=headers)
+    assert "X-Next-Cursor" not in r.headers
+    assert {h["_id"] for h in r.json()} >= set(seen)
+
+    r = client.get("/habits/?group=Salud&weekday=Mon", headers=headers)
+    assert [h["title"] for h in r.json()] == ["Hábito 1"]
+    assert client.get("/habits/?weekday=Lunes", headers=headers).status_code == 400
+
+
+def test_delete_habit_of_another_user_is_forbidden(client, user_factory, user_token):
+    owner_headers = {"Authorization": f"Bearer {user_token}"}
+    payload = {
+        "title": "Leer",
+        "icon": "book",
+        "color": "#FFD700",
+        "type": "daily",
+        "goal": {"target": 10, "unit": "pages", "period": "daily", "type": "quantity"},
+        "task_days": ["Mon"],
+        "reminders": [],
+    }
+    habit = client.post("/habits/", json=payload, headers=owner_headers).json()
+
+    intruder = user_factory("intruder")
+    client.post("/auth/register", json=intruder)
+    token = client.post("/auth/login", json=intruder).json()["access_token"]
+    intruder_headers = {"Authorization": f"Bearer {token}"}
+
+    for url in (f"/habits/{habit['_id']}", f"/habits/{habit['_id']}?background=true"):
+        assert client.delete(url, headers=intruder_headers).status_code == 403
+    r = client.get(f"/habits/{habit['_id']}", headers=owner_headers)
+    assert r.status_code == 200
+    assert (
+        client.delete(f"/habits/{habit['_id']}", headers=owner_headers).status_code
+        == 204
+    )
+
+
+def test_classification_invalidates_habit_list_etag(client, user_token, monkeypatch):
+    import asyncio
+    import threading
+    import time
+    import uuid
+    from apps.habits.habitsClassifier import classifier
+
+    # El worker no termina hasta que el test ya tiene el ETag previo.
+    release = threading.Event()
+
+    async def classify(data):
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        return "passion"
+
+    monkeypatch.setattr(classifier, "classify", classify)
+    headers = {"Authorization": f"Bearer {user_token}"}
+    payload = {
+        "title": f"Clasificar {uuid.uuid4()}",
+        "icon": "star",
+        "color": "#123456",
+        "type": "daily",
+        "goal": {"target": 1, "unit": "vez", "period": "daily", "type": "quantity"},
+        "task_days": ["Mon"],
+        "reminders": [],
+    }
+    created = client.post("/habits/", json=payload, headers=headers).json()
+    assert created["ikigai_category"] == "pending"
+    etag = client.get("/habits/", headers=headers).headers["ETag"]
+    release.set()
+
+    deadline = time.monotonic() + 5
+    while True:
+        r = client.get("/habits/", headers={**headers, "If-None-Match": etag})
+        if r.status_code == 200 or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+    assert r.status_code == 200
+    habit = next(h for h in r.json() if h["_id"] == created["_id"])
+    assert habit["ikigai_category"] == "passion"
@@ -0,0 +1,327 @@
+import asyncio
+import os
+import uuid
+from datetime import datetime
+
+import pytest
+from beanie import init_beanie
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from apps.admin.adminDBRepository import AdminDBRepository
+from apps.auth.authDBRepository import AuthDBRepository
+from apps.daily_completions.dailyCompletionsDBRepository import (
+    DailyCompletionsDBRepository,
+)
+from apps.habits.habitRollupDBRepository import HabitRollupDBRepository
+from apps.habits.habitsDBRepository import HabitsRepository
+from apps.ikigai.ikigaiDBRepository import IkigaiDBRepository
+from apps.journal.journalDBRepository import JournalDBRepository
+from apps.user.userDBRepository import UserDBRepository
+from db.indexes import drift_report, ensure_indexes
+from models.models import DOCUMENT_MODELS, User
+from utils import revisions
+from utils.jobs import fail_stale_jobs, get_job
+from utils.leader import LeaderLease
+
+OWNER = str(ObjectId())
+DAY = datetime(2025, 1, 1)
+NEXT_DAY = datetime(2025, 1, 2)
+QUESTION_DAY = datetime(1999, 1, 1)
+ENTRY = {
+    "habit_id": ObjectId(),
+    "title": "Leer",
+    "goal": {"period": "daily", "type": "quantity", "target": 1, "unit": "u"},
+    "progress": 0.0,
+    "percentage": 0.0,
+    "completed": False,
+}
+
+habits = HabitsRepository()
+rollups = HabitRollupDBRepository()
+completions = DailyCompletionsDBRepository()
+journal = JournalDBRepository()
+
+
+async def _lease() -> None:
+    lease = LeaderLease("index-test", ttl_seconds=60)
+    await lease.acquire()
+    await lease.release()
+
+
+# Llamadas reales a los repositorios: se explican las consultas que emiten.
+# Quedan fuera los recorridos completos a propósito (catálogo de templates,
+# rebuild, dedupe y migraciones de manage.py) y las inserciones.
+REPOSITORY_CALLS = [
+    pytest.param(
+        lambda: AuthDBRepository().find_by_email("user@example.com"),
+        id="auth.find_by_email",
+    ),
+    pytest.param(
+        lambda: AuthDBRepository().update_password_hash(ObjectId(OWNER), "a", "b"),
+        id="auth.update_password_hash",
+    ),
+    pytest.param(lambda: AuthDBRepository().list_revocations(), id="auth.revocations"),
+    pytest.param(
+        lambda: AuthDBRepository().list_revocations(DAY), id="auth.revocations_since"
+    ),
+    pytest.param(lambda: UserDBRepository().get_by_id(OWNER), id="user.get_by_id"),
+    pytest.param(
+        lambda: UserDBRepository().update_streak(OWNER, DAY.date()),
+        id="user.update_streak",
+    ),
+    pytest.param(
+        lambda: IkigaiDBRepository().get_content_by_owner(OWNER), id="ikigai.get"
+    ),
+    pytest.param(
+        lambda: IkigaiDBRepository().delete_content(OWNER), id="ikigai.delete"
+    ),
+    pytest.param(lambda: habits.list_user_habits(OWNER), id="habits.list"),
+    pytest.param(lambda: habits.list_user_habits_page(OWNER, 10), id="habits.page"),
+    pytest.param(
+        lambda: habits.list_user_habits_page(OWNER, 10, after=ObjectId()),
+        id="habits.page_after",
+    ),
+    *(
+        pytest.param(
+            lambda field=field, value=value: habits.list_user_habits_page(
+                OWNER, 10, filters={field: value}
+            ),
+            id=f"habits.page_{field}",
+        )
+        for field, value in (
+            ("group", "Salud"),
+            ("type", "daily"),
+            ("ikigai_category", "passion"),
+            ("task_days", "Mon"),
+        )
+    ),
+    pytest.param(
+        lambda: habits.count_user_habits(OWNER, {"group": "Salud"}), id="habits.count"
+    ),
+    pytest.param(
+        lambda: habits.list_user_habits_for_weekday(OWNER, "Mon"),
+        id="habits.for_weekday",
+    ),
+    pytest.param(lambda: habits.get_habit(str(ObjectId())), id="habits.get"),
+    pytest.param(
+        lambda: habits.list_habits_by_category("pending", limit=10),
+        id="habits.by_category",
+    ),
+    pytest.param(
+        lambda: habits.set_ikigai_category(ObjectId(), "passion", only_if="pending"),
+        id="habits.set_category",
+    ),
+    pytest.param(
+        lambda: habits.set_template_category(ObjectId(), "passion"),
+        id="templates.set_category",
+    ),
+    pytest.param(
+        lambda: habits.get_cached_category(uuid.uuid4().hex), id="categories.get"
+    ),
+    pytest.param(
+        lambda: habits.save_cached_category(uuid.uuid4().hex, "passion"),
+        id="categories.save",
+    ),
+    pytest.param(
+        lambda: AdminDBRepository().list_habits_for_user(OWNER), id="admin.habits"
+    ),
+    pytest.param(lambda: rollups.list_for_owner(OWNER), id="rollups.list"),
+    pytest.param(lambda: rollups.remove(str(ObjectId())), id="rollups.remove"),
+    pytest.param(
+        lambda: rollups.add_days(OWNER, {ObjectId(): 1}), id="rollups.add_days"
+    ),
+    pytest.param(
+        lambda: rollups.record_entry(OWNER, ObjectId(), DAY.date(), completed=1),
+        id="rollups.record_entry",
+    ),
+    pytest.param(
+        lambda: completions.list_for_range(OWNER, DAY.date(), NEXT_DAY.date()),
+        id="completions.range",
+    ),
+    pytest.param(
+        lambda: completions.list_raw_for_range(
+            OWNER, DAY.date(), NEXT_DAY.date(), ["date"], limit=5, after=DAY
+        ),
+        id="completions.raw_range",
+    ),
+    pytest.param(
+        lambda: completions.calendar_stats(OWNER, DAY.date(), NEXT_DAY.date()),
+        id="completions.calendar_stats",
+    ),
+    pytest.param(
+        lambda: completions.habit_totals(OWNER, DAY.date(), NEXT_DAY.date()),
+        id="completions.habit_totals",
+    ),
+    pytest.param(
+        lambda: completions.remove_habit(OWNER, str(ObjectId())),
+        id="completions.remove_habit",
+    ),
+    pytest.param(
+        lambda: completions.exists(OWNER, DAY.date()), id="completions.exists"
+    ),
+    pytest.param(
+        lambda: completions.update_entry_progress(
+            OWNER, DAY.date(), str(ObjectId()), 1, False
+        ),
+        id="completions.update_entry_progress",
+    ),
+    pytest.param(
+        lambda: completions.append_entry(OWNER, DAY.date(), ENTRY, 1),
+        id="completions.append_entry",
+    ),
+    pytest.param(
+        lambda: completions.delete_day(OWNER, str(ObjectId())),
+        id="completions.delete_day",
+    ),
+    pytest.param(lambda: completions.get_day(OWNER, DAY.date()), id="completions.day"),
+    pytest.param(
+        lambda: completions.get_day_raw(OWNER, DAY.date()), id="completions.day_raw"
+    ),
+    pytest.param(
+        lambda: completions.upsert_day(OWNER, NEXT_DAY.date(), [ENTRY]),
+        id="completions.upsert_day",
+    ),
+    pytest.param(lambda: journal.get_journal_question(DAY), id="journal_question.get"),
+    pytest.param(
+        lambda: journal.claim_journal_question(QUESTION_DAY, DAY),
+        id="journal_question.claim",
+    ),
+    pytest.param(
+        lambda: journal.set_journal_question(QUESTION_DAY, "¿Qué aprendiste?"),
+        id="journal_question.set",
+    ),
+    pytest.param(
+        lambda: journal.release_journal_question_claim(QUESTION_DAY),
+        id="journal_question.release",
+    ),
+    pytest.param(
+        lambda: journal.list_ready_question_days([DAY, NEXT_DAY]),
+        id="journal_question.ready_days",
+    ),
+    pytest.param(lambda: journal.get_journal_by_user_id(OWNER), id="journal.user"),
+    pytest.param(
+        lambda: journal.get_entry_by_date(OWNER, DAY), id="journal_entries.by_date"
+    ),
+    pytest.param(
+        lambda: journal.list_entries(
+            OWNER, 10, after=(DAY, ObjectId()), start=DAY.date(), end=NEXT_DAY.date()
+        ),
+        id="journal_entries.list",
+    ),
+    pytest.param(
+        lambda: journal.search_entries(OWNER, "hábito", 10),
+        id="journal_entries.search",
+    ),
+    pytest.param(
+        lambda: revisions.current(OWNER, [revisions.HABITS]), id="revisions.current"
+    ),
+    pytest.param(lambda: revisions.bump(OWNER, revisions.HABITS), id="revisions.bump"),
+    pytest.param(_lease, id="scheduler_leases.acquire"),
+    pytest.param(lambda: get_job(str(ObjectId())), id="background_jobs.get"),
+    pytest.param(fail_stale_jobs, id="background_jobs.fail_stale"),
+]
+
+# Comandos que aceptan explain; las escrituras se explican de a una sentencia.
+EXPLAINABLE = {"find", "aggregate", "count", "distinct", "findAndModify"}
+STATEMENTS = {"update": "updates", "delete": "deletes"}
+# Campos de sesión y de escritura que explain no acepta.
+SESSION_FIELDS = {"lsid", "txnNumber", "writeConcern", "readConcern"}
+
+
+class QueryRecorder(monitoring.CommandListener):
+    """Guarda los comandos que emite el cliente mientras ``commands`` no es None."""
+
+    def __init__(self):
+        self.commands = None
+
+    def started(self, event):
+        if self.commands is None:
+            return
+        name = event.command_name
+        if name not in EXPLAINABLE and name not in STATEMENTS:
+            return
+        command = {
+            key: value
+            for key, value in event.command.items()
+            if key not in SESSION_FIELDS and not key.startswith("$")
+        }
+        if name in STATEMENTS:
+            field = STATEMENTS[name]
+            for statement in command.pop(field):
+                self.commands.append({**command, field: [statement]})
+        else:
+            self.commands.append(command)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+recorder = QueryRecorder()
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _winning_plans(explain):
+    # find y las escrituras la traen en queryPlanner; aggregate, según la
+    # versión, dentro de cada etapa $cursor.
+    if isinstance(explain, dict):
+        for key, value in explain.items():
+            if key == "winningPlan":
+                yield value
+            else:
+                yield from _winning_plans(value)
+    elif isinstance(explain, list):
+        for value in explain:
+            yield from _winning_plans(value)
+
+
+def _stages(plan: dict):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _stages(child)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def built_indexes():
+    # Beanie sobre la base de test con un cliente que reporta a ``recorder``.
+    client = AsyncIOMotorClient(os.environ["MONGODB_URI"], event_listeners=[recorder])
+    database = client[os.environ["MONGO_DB_NAME_TEST"]]
+    _run(init_beanie(database=database, document_models=DOCUMENT_MODELS))
+    _run(ensure_indexes(DOCUMENT_MODELS))
+    yield
+    client.close()
+
+
+def test_declared_indexes_are_built():
+    report = _run(drift_report(DOCUMENT_MODELS))
+    assert [e for e in report if e["missing"] or e["changed"]] == []
+
+
+@pytest.mark.parametrize("call", REPOSITORY_CALLS)
+def test_repository_query_uses_index(call):
+    recorder.commands = []
+    try:
+        _run(call())
+    finally:
+        commands, recorder.commands = recorder.commands, None
+    assert commands, "el repositorio no emitió consultas"
+
+    database = User.get_motor_collection().database
+    for command in commands:
+        explain = _run(
+            database.command({"explain": command, "verbosity": "queryPlanner"})
+        )
+        plans = list(_winning_plans(explain))
+        assert plans, explain
+        for plan in plans:
+            assert "COLLSCAN" not in set(_stages(plan)), (command, plan)
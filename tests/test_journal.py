@@ -0,0 +1,205 @@
+import pytest
+from datetime import date
+
+
+@pytest.mark.asyncio
+async def test_journal_entries_append_and_lookup_by_date(client, user_token, clean_db):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    today = date.today()
+
+    for text in ("Primera reflexión", "Segunda reflexión"):
+        resp = client.post("/journal/entry", json={"entry": text}, headers=headers)
+        assert resp.status_code == 201, resp.json()
+
+    resp = client.get(f"/journal/entry/{today}", headers=headers)
+    assert resp.json()["entry"] == "Primera reflexión"
+
+    entries = client.get("/journal/entries", headers=headers).json()
+    assert [e["entry"] for e in entries] == ["Primera reflexión", "Segunda reflexión"]
+
+
+@pytest.mark.asyncio
+async def test_journal_entries_are_paginated_with_a_cursor(
+    client, user_token, clean_db
+):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    for i in range(5):
+        client.post("/journal/entry", json={"entry": f"Entrada {i}"}, headers=headers)
+
+    seen = []
+    params = {"limit": 2}
+    while True:
+        resp = client.get("/journal/entries", params=params, headers=headers)
+        assert resp.status_code == 201, resp.json()
+        assert len(resp.json()) <= 2
+        seen += [e["entry"] for e in resp.json()]
+        if "X-Next-Cursor" not in resp.headers:
+            break
+        params["cursor"] = resp.headers["X-Next-Cursor"]
+    assert seen == [f"Entrada {i}" for i in range(5)]
+
+    resp = client.get(
+        "/journal/entries", params={"cursor": "no-es-un-cursor"}, headers=headers
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_journal_search_ranks_spanish_matches(client, user_token, clean_db):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    for text in (
+        "Hoy salí a correr temprano y me sentí con energía",
+        "Leí un libro sobre hábitos",
+        "Corrí de nuevo; correr ya es parte de mi rutina",
+    ):
+        client.post("/journal/entry", json={"entry": text}, headers=headers)
+
+    resp = client.get("/journal/search", params={"q": "correr"}, headers=headers)
+    assert resp.status_code == 200, resp.json()
+    hits = resp.json()
+    assert len(hits) == 2
+    assert hits[0]["score"] >= hits[1]["score"]
+    assert all("orr" in hit["snippet"] for hit in hits)
+
+    page = client.get(
+        "/journal/search", params={"q": "correr", "limit": 1}, headers=headers
+    )
+    assert len(page.json()) == 1
+
+
+@pytest.mark.asyncio
+async def test_claim_journal_question_is_taken_once_until_stale(client):
+    from datetime import datetime, timedelta
+    from apps.journal.journalDBRepository import JournalDBRepository
+    from models.models import JournalQuestion
+
+    repo = JournalDBRepository()
+    day = datetime(2001, 1, 1)
+    await JournalQuestion.get_motor_collection().delete_many({"date": day})
+    fresh = datetime.utcnow() - timedelta(minutes=5)
+    try:
+        assert await repo.claim_journal_question(day, fresh) is True
+        # El reclamo vigente no calza con el filtro y el upsert choca con el
+        # índice único: DuplicateKeyError se traduce en False.
+        assert await repo.claim_journal_question(day, fresh) is False
+
+        stale = datetime.utcnow() + timedelta(minutes=5)
+        assert await repo.claim_journal_question(day, stale) is True
+
+        assert await repo.set_journal_question(day, "¿Qué aprendiste hoy?")
+        assert await repo.claim_journal_question(day, stale) is False
+        assert await JournalQuestion.find(JournalQuestion.date == day).count() == 1
+    finally:
+        await JournalQuestion.get_motor_collection().delete_many({"date": day})
+
+
+@pytest.mark.asyncio
+async def test_daily_question_requests_are_coalesced_in_process(client, monkeypatch):
+    import asyncio
+    from datetime import datetime
+    from apps.journal.journalService import JournalService
+    from models.models import JournalQuestion
+
+    today = datetime.combine(date.today(), datetime.min.time())
+    collection = JournalQuestion.get_motor_collection()
+    await collection.delete_many({"date": today})
+    service = JournalService()
+    calls = []
+
+    async def generate_daily_questions(count=1):
+        calls.append(count)
+        await asyncio.sleep(0.05)
+        return ["¿Qué te hizo sonreír hoy?"]
+
+    monkeypatch.setattr(service, "generate_daily_questions", generate_daily_questions)
+    try:
+        answers = await asyncio.gather(
+            *(service.get_or_create_daily_question() for _ in range(5))
+        )
+        assert {a.question for a in answers} == {"¿Qué te hizo sonreír hoy?"}
+        assert calls == [1]
+        # Ya en memoria: no vuelve a Mongo ni a Gemini.
+        await service.get_or_create_daily_question()
+        assert calls == [1]
+    finally:
+        await collection.delete_many({"date": today})
+
+
+def test_parse_questions_strips_numbering_blank_lines_and_repeats():
+    from apps.journal.journalService import _parse_questions
+
+    assert _parse_questions("¿Qué amas?\n¿En qué eres bueno?") == [
+        "¿Qué amas?",
+        "¿En qué eres bueno?",
+    ]
+    messy = "1. ¿Qué amas?\n\n  - ¿Qué necesita el mundo?  \n2) ¿Qué amas?\n* ¿Y hoy?"
+    assert _parse_questions(messy) == [
+        "¿Qué amas?",
+        "¿Qué necesita el mundo?",
+        "¿Y hoy?",
+    ]
+    assert _parse_questions("") == []
+    assert _parse_questions("\n  -  \n") == []
+
+
+@pytest.mark.asyncio
+async def test_only_the_lease_holder_pregenerates_questions():
+    from apps.journal.journalScheduler import JournalQuestionScheduler
+    from utils.leader import LeaderLease
+
+    calls = []
+    schedulers = [JournalQuestionScheduler(days_ahead=2, interval=60) for _ in "ab"]
+    for name, scheduler in zip("ab", schedulers):
+
+        async def pregenerate_questions(days_ahead, name=name):
+            calls.append(name)
+            return 0
+
+        scheduler.lease = LeaderLease("journal-questions-test", ttl_seconds=60)
+        scheduler.service.pregenerate_questions = pregenerate_questions
+    first, second = schedulers
+    try:
+        assert await first.run_once() is False
+        assert await second.run_once() is False
+        assert await first.run_once() is False
+        assert calls == ["a", "a"]
+        assert first.lease.is_leader and not second.lease.is_leader
+
+        await first.lease.release()
+        await second.run_once()
+        assert calls == ["a", "a", "b"]
+    finally:
+        await first.lease.release()
+        await second.lease.release()
+
+
+@pytest.mark.asyncio
+async def test_pregenerate_fills_days_gemini_left_out_on_the_next_pass():
+    from datetime import datetime, timedelta
+    from apps.journal.journalService import JournalService
+    from models.models import JournalQuestion
+
+    days = [
+        datetime.combine(date.today() + timedelta(days=i), datetime.min.time())
+        for i in range(3)
+    ]
+    collection = JournalQuestion.get_motor_collection()
+    await collection.delete_many({"date": {"$in": days}})
+    service = JournalService()
+    requested = []
+
+    async def generate_daily_questions(count=1):
+        requested.append(count)
+        # La primera vez Gemini devuelve una sola de las preguntas pedidas.
+        returned = 1 if len(requested) == 1 else count
+        return [f"¿Pregunta {len(requested)}.{i}?" for i in range(returned)]
+
+    service.generate_daily_questions = generate_daily_questions
+    try:
+        assert await service.pregenerate_questions(3) == 2
+        assert await service.pregenerate_questions(3) == 0
+        assert requested == [3, 2]
+        ready = await service.repo.list_ready_question_days(days)
+        assert ready == {day.date() for day in days}
+    finally:
+        await collection.delete_many({"date": {"$in": days}})
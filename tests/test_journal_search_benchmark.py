@@ -0,0 +1,62 @@
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from apps.journal.journalDBRepository import JournalDBRepository
+from models.models import JournalEntryRecord
+
+ENTRIES = 10_000
+QUERIES = ["correr parque", "familia", "meditación", "trabajo estrés", "gratitud"]
+WORDS = (
+    "hoy fue un día tranquilo trabajé mucho y después salí a correr al parque "
+    "cené con mi familia medité diez minutos sentí gratitud por lo aprendido "
+    "el estrés del trabajo bajó cuando leí un libro antes de dormir"
+).split()
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+@pytest.mark.slow
+def test_search_latency_on_10k_entry_journal(record_property):
+    user_id = ObjectId()
+    rng = random.Random(42)
+    start = datetime(2000, 1, 1)
+    collection = JournalEntryRecord.get_motor_collection()
+    _run(
+        collection.insert_many(
+            [
+                {
+                    "user_id": user_id,
+                    "date": start + timedelta(days=i),
+                    "entry": " ".join(rng.choices(WORDS, k=40)),
+                }
+                for i in range(ENTRIES)
+            ]
+        )
+    )
+    repo = JournalDBRepository()
+    try:
+        explain = _run(
+            collection.find(
+                {"user_id": user_id, "$text": {"$search": "familia"}}
+            ).explain()
+        )
+        assert "COLLSCAN" not in str(explain["queryPlanner"]["winningPlan"])
+
+        timings = []
+        for query in QUERIES * 4:
+            began = time.perf_counter()
+            hits = _run(repo.search_entries(str(user_id), query, limit=20))
+            timings.append(time.perf_counter() - began)
+            assert len(hits) == 20
+        record_property("p50_ms", round(statistics.median(timings) * 1000, 1))
+        record_property("max_ms", round(max(timings) * 1000, 1))
+    finally:
+        _run(collection.delete_many({"user_id": user_id}))
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from apps.daily_completions.dailyCompletionsService import DailyCompletionsService
+from apps.habits.habitsService import HabitsService
+from models.models import DailyCompletions, Habit
+from schemas.habits import HabitOut
+from schemas.roles import TokenData
+from utils.fast_json import dumps
+
+HABITS = 120
+MONTH = "2025-01"
+ROUNDS = 20
+DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+GOAL = {"period": "daily", "type": "quantity", "target": 10, "unit": "pages"}
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _timed(fn) -> List[float]:
+    timings = []
+    for _ in range(ROUNDS):
+        began = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - began)
+    return timings
+
+
+def _seed(owner: ObjectId) -> None:
+    now = datetime.utcnow()
+    habits = [
+        {
+            "_id": ObjectId(),
+            "owner_id": owner,
+            "title": f"Hábito {i}",
+            "description": "Leer al menos 10 páginas",
+            "icon": "book",
+            "color": "#FFD700",
+            "group": "Personal",
+            "type": "daily",
+            "ikigai_category": "passion",
+            "goal": GOAL,
+            "task_days": list(DAYS),
+            "reminders": ["08:00", "20:00"],
+            "created_at": now,
+        }
+        for i in range(HABITS)
+    ]
+    _run(Habit.get_motor_collection().insert_many(habits))
+    _run(
+        DailyCompletions.get_motor_collection().insert_many(
+            [
+                {
+                    "user_id": owner,
+                    "date": datetime(2025, 1, 1) + timedelta(days=day),
+                    "completions": [
+                        {
+                            "habit_id": habit["_id"],
+                            "title": habit["title"],
+                            "goal": GOAL,
+                            "progress": float(day % 11),
+                            "percentage": (day % 11) / 10,
+                            "completed": day % 11 >= 10,
+                        }
+                        for habit in habits
+                    ],
+                    "overall_percentage": (day % 11) / 10,
+                    "day_completed": day % 11 >= 10,
+                }
+                for day in range(31)
+            ]
+        )
+    )
+
+
+@pytest.fixture
+def read_paths():
+    owner = ObjectId()
+    user = TokenData(user_id=str(owner), role="user")
+    habits_service = HabitsService()
+    completions_service = DailyCompletionsService()
+    habits_out = TypeAdapter(List[HabitOut])
+    _seed(owner)
+
+    def habits_before() -> bytes:
+        # Lo que hacían el servicio y response_model antes del cambio.
+        habits = _run(Habit.find(Habit.owner_id == owner).to_list())
+        rows = [HabitOut.model_dump(h) for h in habits]
+        payload = habits_out.dump_python(
+            habits_out.validate_python(rows), mode="json", by_alias=True
+        )
+        return json.dumps(payload).encode("utf-8")
+
+    def habits_after() -> bytes:
+        habits, _, _ = _run(habits_service.list_habits(user, limit=HABITS))
+        return dumps(habits)
+
+    def month_before() -> bytes:
+        docs = _run(
+            DailyCompletions.find(
+                DailyCompletions.user_id == owner,
+                DailyCompletions.date >= datetime(2025, 1, 1).date(),
+                DailyCompletions.date < datetime(2025, 2, 1).date(),
+            )
+            .sort(+DailyCompletions.date)
+            .to_list()
+        )
+        return json.dumps(jsonable_encoder(docs)).encode("utf-8")
+
+    def month_after() -> bytes:
+        days, _ = _run(completions_service.get_month(str(owner), MONTH))
+        return dumps(days)
+
+    try:
+        yield {
+            "habits": (habits_before, habits_after),
+            "month": (month_before, month_after),
+        }
+    finally:
+        _run(Habit.get_motor_collection().delete_many({"owner_id": owner}))
+        _run(DailyCompletions.get_motor_collection().delete_many({"user_id": owner}))
+
+
+def test_read_path_matches_beanie_round_trip(read_paths):
+    for before, after in read_paths.values():
+        assert json.loads(before()) == json.loads(after())
+
+
+@pytest.mark.slow
+def test_read_path_timings(read_paths, record_property):
+    for name, (before, after) in read_paths.items():
+        slow = statistics.median(_timed(before))
+        fast = statistics.median(_timed(after))
+        record_property(f"{name}_before_ms", round(slow * 1000, 1))
+        record_property(f"{name}_after_ms", round(fast * 1000, 1))
@@ -0,0 +1,122 @@
+import pytest
+
+IKIGAI = {
+    "arquetype": "social",
+    "you_love": "Enseñar",
+    "good_at": "Explicar",
+    "world_needs": "Educación",
+    "is_profitable": "Clases",
+}
+
+
+@pytest.mark.asyncio
+async def test_user_profile_reflects_ikigai_changes(client, user_token, clean_db):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    assert client.get("/user/", headers=headers).json()["ikigai"] is None
+
+    resp = client.post("/ikigai/", json=IKIGAI, headers=headers)
+    assert resp.status_code == 201, resp.json()
+    assert client.get("/user/", headers=headers).json()["ikigai"]["you_love"] == (
+        "Enseñar"
+    )
+
+    client.put("/ikigai/", json={"you_love": "Aprender"}, headers=headers)
+    assert client.get("/user/", headers=headers).json()["ikigai"]["you_love"] == (
+        "Aprender"
+    )
+
+
+@pytest.mark.asyncio
+async def test_user_profile_sees_writes_from_other_workers(
+    client, user_token, clean_db
+):
+    from bson import ObjectId
+    from models.models import User
+    from utils import revisions
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+    first = client.get("/user/", headers=headers)
+    assert first.json()["streak"] == 0
+
+    # Otro worker actualiza la racha: este no ve ninguna invalidación local.
+    user_id = first.json()["_id"]
+    await User.get_motor_collection().update_one(
+        {"_id": ObjectId(user_id)}, {"$set": {"streak": 3}}
+    )
+    await revisions.bump(user_id, revisions.PROFILE)
+
+    resp = client.get(
+        "/user/", headers={**headers, "If-None-Match": first.headers["ETag"]}
+    )
+    assert resp.status_code == 200
+    assert resp.json()["streak"] == 3
+
+
+async def _streak_user(streak=0, last_timestamp=None):
+    import uuid
+    from models.models import User
+
+    user = User(
+        email=f"streak_{uuid.uuid4().hex[:8]}@example.com",
+        hashed_password="x",
+        streak=streak,
+        last_timestamp=last_timestamp,
+    )
+    await user.insert()
+    return str(user.id)
+
+
+async def _streak(user_id):
+    from datetime import datetime
+    from bson import ObjectId
+    from models.models import User
+
+    doc = await User.get_motor_collection().find_one({"_id": ObjectId(user_id)})
+    last = doc["last_timestamp"]
+    return doc["streak"], last.date() if isinstance(last, datetime) else last
+
+
+@pytest.mark.asyncio
+async def test_update_streak_counts_consecutive_days(client, clean_db):
+    from datetime import date, timedelta
+    from apps.user.userDBRepository import UserDBRepository
+
+    repo = UserDBRepository()
+    today = date.today()
+    user_id = await _streak_user(streak=4, last_timestamp=today - timedelta(days=1))
+
+    assert await repo.update_streak(user_id, today) is True
+    assert await _streak(user_id) == (5, today)
+
+    # Otra completación el mismo día no cambia nada.
+    assert await repo.update_streak(user_id, today) is False
+    assert await _streak(user_id) == (5, today)
+
+
+@pytest.mark.asyncio
+async def test_update_streak_resets_after_a_gap(client, clean_db):
+    from datetime import date, timedelta
+    from apps.user.userDBRepository import UserDBRepository
+
+    today = date.today()
+    user_id = await _streak_user(streak=4, last_timestamp=today - timedelta(days=3))
+
+    assert await UserDBRepository().update_streak(user_id, today) is True
+    assert await _streak(user_id) == (1, today)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_completions_count_once(client, clean_db):
+    import asyncio
+    from datetime import date
+    from apps.user.userDBRepository import UserDBRepository
+
+    repo = UserDBRepository()
+    today = date.today()
+    user_id = await _streak_user()
+
+    results = await asyncio.gather(
+        *(repo.update_streak(user_id, today) for _ in range(5))
+    )
+    assert sorted(results) == [False] * 4 + [True]
+    assert await _streak(user_id) == (1, today)